@@ -15,7 +15,7 @@ else
 fi
 
 # Check if data exists
-if [ -f "data/processed/ppr_consolidated.parquet" ]; then
+if [ -e "data/processed/ppr_consolidated.parquet" ]; then
     echo "✅ Consolidated data: EXISTS"
     size=$(du -h data/processed/ppr_consolidated.parquet | cut -f1)
     echo "   Size: $size"
@@ -37,13 +37,33 @@ class Config:
     MAX_RETRIES: Final[int] = 3
     RETRY_DELAY: Final[int] = 5  # seconds
     RETRY_BACKOFF: Final[float] = 2.0  # exponential backoff multiplier
-    CHUNK_SIZE: Final[int] = 8192  # bytes for streaming downloads
+    RETRY_JITTER: Final[bool] = True  # randomize backoff to spread out retries
+    RETRY_MIN_DELAY: Final[float] = 0.5  # seconds, floor for jittered backoff
+    # Streaming chunk size in bytes. Throughput flattens out above ~100 KiB, while
+    # small chunks (e.g. 8 KiB) make the Python write loop the bottleneck
+    CHUNK_SIZE: Final[int] = 262144
+    WRITE_BUFFER_SIZE: Final[int] = 1 << 20  # file buffer for coalescing writes
+    HASH_BLOCK_SIZE: Final[int] = 1 << 20  # read size when hashing files
+    PROGRESS_LOG_INTERVAL: Final[int] = 10 * 1024 * 1024  # bytes between progress logs without a TTY
     TIMEOUT: Final[int] = 30  # seconds
     MIN_FILE_SIZE: Final[int] = 1024  # minimum valid file size in bytes
+    POOL_CONNECTIONS: Final[int] = 4  # connection pools kept by the HTTP session
+    POOL_MAXSIZE: Final[int] = 16  # max pooled connections per host
+    MAX_DOWNLOAD_CONCURRENCY: Final[int] = 5  # parallel monthly downloads
+    RANGE_STREAMS: Final[int] = 5  # parallel Range streams for PPR-ALL.zip
+    PIN_DNS: Final[bool] = True  # resolve the PPR host once per process
+    USER_AGENT: Final[str] = "Mozilla/5.0 (PropertyPriceRegister ETL Pipeline)"
     
     # Data processing settings
-    CSV_CHUNK_SIZE: Final[int] = 100000  # rows per chunk for large file processing
-    PARQUET_COMPRESSION: Final[str] = "snappy"
+    CSV_BLOCK_SIZE: Final[int] = 8 << 20  # bytes per PyArrow CSV parse block
+    SCAN_BLOCK_SIZE: Final[int] = 1 << 20  # bytes per read when counting CSV rows
+    EXTRACT_BUFFER_SIZE: Final[int] = 1 << 20  # bytes per copy when extracting ZIP members
+    MAX_EXTRACT_WORKERS: Final[int] = 8  # ZIP archives extracted in parallel
+    PARQUET_COMPRESSION: Final[str] = "zstd"
+    PARQUET_COMPRESSION_LEVEL: Final[int] = 3
+    
+    # Price column header; PPR files are Windows-1252 so the Euro sign is byte 0x80
+    PRICE_COLUMN: Final[str] = "Price (€)"
     
     # Expected CSV columns (from PPR website)
     EXPECTED_COLUMNS: Final[list] = [
@@ -51,18 +71,41 @@ class Config:
         "Address",
         "County",
         "Eircode",
-        "Price (€)",
+        PRICE_COLUMN,
         "Not Full Market Price",
         "VAT Exclusive",
         "Description of Property",
         "Property Size Description"
     ]
     
+    # Candidate CSV encodings in order of preference (PPR files are Windows-1252)
+    CSV_ENCODINGS: Final[list] = ['windows-1252', 'iso-8859-1', 'utf-8']
+    ENCODING_SNIFF_BYTES: Final[int] = 4096  # bytes read to detect a file's encoding
+    
     # Logging settings
     LOG_FORMAT: Final[str] = "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s"
     LOG_DATE_FORMAT: Final[str] = "%Y-%m-%d %H:%M:%S"
     LOG_FILE_PATTERN: Final[str] = "etl_pipeline_{date}.log"
     LOG_RETENTION_DAYS: Final[int] = 30
+    LOG_MAX_BYTES: Final[int] = 50 << 20  # rotate the daily log file past this size
+    LOG_BACKUP_COUNT: Final[int] = 7  # rotated log files kept per day
+    LOG_BUFFER_CAPACITY: Final[int] = 1024  # records buffered before a file write
+    
+    # Metadata settings
+    FILES_PROCESSED_HISTORY: Final[int] = 100  # processed-file entries kept in metadata
+    
+    @classmethod
+    def monthly_url(cls, year: int, month: int) -> str:
+        """Build the download URL for a monthly CSV (same as MONTHLY_URL_PATTERN)."""
+        return f"{cls.BASE_URL}/PPR-{year}-{month:02d}.csv/$FILE/PPR-{year}-{month:02d}.csv"
+    
+    @classmethod
+    def county_url(cls, year: int, month: int, county: str) -> str:
+        """Build the download URL for a county CSV (same as COUNTY_URL_PATTERN)."""
+        return (
+            f"{cls.BASE_URL}/PPR-{year}-{month:02d}-{county}.csv"
+            f"/$FILE/PPR-{year}-{month:02d}-{county}.csv"
+        )
     
     @classmethod
     def ensure_directories(cls) -> None:
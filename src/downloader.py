@@ -5,14 +5,23 @@ Handles downloading files from the PPR website with retry logic,
 progress tracking, and error handling.
 """
 
+import hashlib
+import random
+import socket
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 import warnings
+import zipfile
 
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+import urllib3.util.connection as urllib3_connection
 
 # Suppress SSL warnings since we're disabling verification for the government site
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
@@ -22,18 +31,178 @@ from logger_config import get_logger
 
 logger = get_logger(__name__)
 
+# Shared session so monthly/county downloads reuse pooled TCP+TLS connections
+# instead of re-handshaking with the PPR server for every file
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=config.POOL_CONNECTIONS,
+        pool_maxsize=config.POOL_MAXSIZE,
+        max_retries=0  # Retries are handled by download_file
+    )
+)
+_SESSION.headers.update({'User-Agent': config.USER_AGENT})
+
+# Resolve the PPR host once per process and reuse its addresses for every new
+# pooled/ranged connection, instead of a DNS lookup per connection. Resolution
+# is lazy (on first connect) and follows urllib3's address family rule; each
+# cached address is tried in turn, the one that connects is tried first next
+# time, and if none connect the pin is dropped so the next retry resolves again.
+# Cached lists are never modified after they are stored, only replaced.
+_PINNED_HOST = urlparse(config.BASE_URL).hostname
+_resolved_hosts: Dict[Tuple[str, int], List[str]] = {}
+_create_connection = urllib3_connection.create_connection
+
+
+def _create_connection_pinned(address, *args, **kwargs):
+    """urllib3 create_connection wrapper that caches the PPR host's addresses."""
+    host, port = address
+    if host != _PINNED_HOST:
+        return _create_connection(address, *args, **kwargs)
+    
+    ips = _resolved_hosts.get((host, port))
+    if ips is None:
+        family = urllib3_connection.allowed_gai_family()
+        ips = list(dict.fromkeys(
+            res[4][0] for res in socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+        ))
+        _resolved_hosts[(host, port)] = ips
+        logger.debug("Pinned %s to %s", host, ", ".join(ips))
+    
+    err = None
+    for ip in ips:
+        try:
+            sock = _create_connection((ip, port), *args, **kwargs)
+        except OSError as e:
+            err = e
+            continue
+        
+        if ip != ips[0]:
+            # Download threads share the cached list, so publish a reordered
+            # copy instead of reordering it in place
+            _resolved_hosts[(host, port)] = [ip] + [other for other in ips if other != ip]
+        return sock
+    
+    _resolved_hosts.pop((host, port), None)
+    if err is None:
+        err = OSError(f"getaddrinfo returned no addresses for {host}")
+    raise err
+
+
+if config.PIN_DNS:
+    urllib3_connection.create_connection = _create_connection_pinned
+
+
+class DownloadStatus(Enum):
+    """
+    Outcomes of a download request that fetched nothing new but are not failures.
+    
+    Members are falsy, so a plain truthiness check on a download result never
+    mistakes them for a successful download.
+    """
+    NOT_MODIFIED = 'not_modified'  # Conditional request got 304 Not Modified
+    NOT_FOUND = 'not_found'  # Server reported 404 Not Found
+    
+    def __bool__(self) -> bool:
+        return False
+
+
+NOT_MODIFIED = DownloadStatus.NOT_MODIFIED
+NOT_FOUND = DownloadStatus.NOT_FOUND
+
 
 class DownloadError(Exception):
     """Raised when download fails after all retries."""
     pass
 
 
+class _RangeNotHonoured(requests.exceptions.RequestException):
+    """The server answered a Range request with the whole file."""
+
+
+# Directories already created by this process. download_file checks this
+# before calling mkdir so backfills over hundreds of files don't repeat the
+# syscall; run_pipeline normally creates everything up front via
+# config.ensure_directories().
+_ensured_dirs = set()
+
+
+def _ensure_dir(directory: Path) -> None:
+    """Create a directory once per process."""
+    if directory not in _ensured_dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(directory)
+
+
+def _no_progress(nbytes: int) -> None:
+    """Progress callback that does nothing."""
+
+
+def _progress_logger(filename: str) -> Callable[[int], None]:
+    """
+    Build a progress callback that logs every PROGRESS_LOG_INTERVAL bytes.
+    
+    Args:
+        filename: Name shown in the log lines
+    
+    Returns:
+        Callback taking the number of bytes just written
+    """
+    downloaded = 0
+    next_log = config.PROGRESS_LOG_INTERVAL
+    
+    def progress(nbytes: int) -> None:
+        nonlocal downloaded, next_log
+        downloaded += nbytes
+        if downloaded >= next_log:
+            logger.info("%s: %.0f MB downloaded", filename, downloaded / (1024 * 1024))
+            next_log += config.PROGRESS_LOG_INTERVAL
+    
+    return progress
+
+
+def _resume_validator_path(part_path: Path) -> Path:
+    """Path of the file recording which remote version a .part file holds."""
+    return part_path.with_suffix(part_path.suffix + '.validator')
+
+
+def _if_range_validator(response: requests.Response) -> Optional[str]:
+    """
+    Pick the response validator usable in an If-Range header.
+    
+    If-Range needs a strong validator, so a weak ETag falls back to Last-Modified.
+    """
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+def _discard_part(part_path: Path) -> None:
+    """Delete a partial download and its validator record."""
+    part_path.unlink(missing_ok=True)
+    _resume_validator_path(part_path).unlink(missing_ok=True)
+
+
+def _wait_before_retry(attempt: int) -> None:
+    """Sleep with exponential backoff (and optional jitter) after a failed attempt."""
+    wait_time = config.RETRY_DELAY * (config.RETRY_BACKOFF ** (attempt - 1))
+    if config.RETRY_JITTER:
+        # Full jitter so concurrent retries don't hit the server in lockstep
+        wait_time = max(config.RETRY_MIN_DELAY, random.uniform(0, wait_time))
+    logger.info(f"Waiting {wait_time:.1f}s before retry...")
+    time.sleep(wait_time)
+
+
 def download_file(
     url: str,
     destination: Path,
     max_retries: Optional[int] = None,
-    show_progress: bool = True
-) -> bool:
+    show_progress: bool = True,
+    validators: Optional[Dict] = None,
+    kind: Optional[str] = None
+) -> Union[bool, DownloadStatus]:
     """
     Download a file with retry logic and progress indication.
     
@@ -42,9 +211,15 @@ def download_file(
         destination: Path where file should be saved
         max_retries: Maximum retry attempts (default from config)
         show_progress: Whether to show progress bar
+        validators: Cache validators ('etag', 'last_modified') from the last
+            download. Sent as a conditional request when destination exists,
+            and updated in place from the response after a download.
+        kind: Passed to verify_download before the file replaces destination
     
     Returns:
-        True if download successful, False otherwise
+        True if download successful, NOT_MODIFIED if the server reports the
+        existing file is current, NOT_FOUND if the file doesn't exist (yet),
+        False otherwise
     
     Raises:
         DownloadError: If download fails after all retries
@@ -53,27 +228,93 @@ def download_file(
         max_retries = config.MAX_RETRIES
     
     # Ensure destination directory exists
-    destination.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(destination.parent)
     
     # Extract filename from URL for logging
     filename = Path(urlparse(url).path).name
     
+    # Download into a .part file so an interrupted transfer can be resumed;
+    # the remote version it belongs to is recorded alongside
+    part_path = destination.with_suffix(destination.suffix + '.part')
+    validator_path = _resume_validator_path(part_path)
+    
     for attempt in range(1, max_retries + 1):
+        response = None
         try:
-            logger.info(f"Downloading {filename} (attempt {attempt}/{max_retries})...")
-            logger.debug(f"URL: {url}")
-            logger.debug(f"Destination: {destination}")
+            logger.info("Downloading %s (attempt %d/%d)...", filename, attempt, max_retries)
+            logger.debug("URL: %s", url)
+            logger.debug("Destination: %s", destination)
+            
+            headers = {}
+            resume_from = part_path.stat().st_size if part_path.exists() else 0
+            
+            if resume_from > 0:
+                try:
+                    part_validator = validator_path.read_text().strip()
+                except FileNotFoundError:
+                    part_validator = ''
+                if not part_validator:
+                    # Can't tell which version the bytes belong to, start over
+                    logger.info("Discarding unverifiable partial download of %s", filename)
+                    _discard_part(part_path)
+                    resume_from = 0
+            
+            if resume_from > 0:
+                # Only fetch the bytes we don't already have, and only if the
+                # remote file is still the version the part file came from
+                # (otherwise the server sends the whole new file with a 200)
+                headers['Range'] = f'bytes={resume_from}-'
+                headers['If-Range'] = part_validator
+                logger.info("Resuming %s from %.1f MB", filename, resume_from / (1024 * 1024))
+            elif validators and destination.exists():
+                # Only revalidate if we still have the file the validators describe
+                if validators.get('etag'):
+                    headers['If-None-Match'] = validators['etag']
+                if validators.get('last_modified'):
+                    headers['If-Modified-Since'] = validators['last_modified']
             
-            # Make request with streaming
-            response = requests.get(
+            # Make request with streaming over the pooled session
+            response = _SESSION.get(
                 url,
                 stream=True,
                 timeout=config.TIMEOUT,
-                headers={'User-Agent': 'Mozilla/5.0 (PropertyPriceRegister ETL Pipeline)'},
+                headers=headers,
                 verify=False  # Disable SSL verification for this government site
             )
             response.raise_for_status()
             
+            if response.status_code == 304:
+                logger.info("%s not modified since last download", filename)
+                return NOT_MODIFIED
+            
+            # 206 means the server honoured the Range header; a plain 200 sends
+            # the whole file, so start the part file over
+            if response.status_code == 206:
+                content_range = response.headers.get('Content-Range', '')
+                if not content_range.startswith(f'bytes {resume_from}-'):
+                    _discard_part(part_path)
+                    raise requests.exceptions.RequestException(
+                        f"Unexpected Content-Range '{content_range}' resuming at byte {resume_from}"
+                    )
+            else:
+                resume_from = 0
+            
+            if resume_from == 0:
+                # Record the version this part file holds before writing it
+                new_validator = _if_range_validator(response)
+                if new_validator:
+                    validator_path.write_text(new_validator)
+                else:
+                    validator_path.unlink(missing_ok=True)
+            file_mode = 'ab' if resume_from > 0 else 'wb'
+            
+            # Hash while streaming so callers never need to re-read the file
+            hasher = hashlib.sha256()
+            if resume_from > 0:
+                with open(part_path, 'rb') as existing:
+                    while block := existing.read(config.HASH_BLOCK_SIZE):
+                        hasher.update(block)
+            
             # Get total file size
             total_size = int(response.headers.get('content-length', 0))
             
@@ -81,25 +322,36 @@ def download_file(
             downloaded_size = 0
             start_time = time.time()
             
-            with open(destination, 'wb') as f:
-                if show_progress and total_size > 0:
-                    with tqdm(
-                        total=total_size,
-                        unit='B',
-                        unit_scale=True,
-                        unit_divisor=1024,
-                        desc=filename
-                    ) as pbar:
-                        for chunk in response.iter_content(chunk_size=config.CHUNK_SIZE):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded_size += len(chunk)
-                                pbar.update(len(chunk))
-                else:
+            # Progress bars only make sense on an interactive terminal;
+            # otherwise log periodically (cron/CI) or not at all
+            pbar = None
+            if show_progress and total_size > 0 and sys.stderr.isatty():
+                pbar = tqdm(
+                    total=resume_from + total_size,
+                    initial=resume_from,
+                    unit='B',
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    desc=filename,
+                    mininterval=0.5
+                )
+                progress = pbar.update
+            elif show_progress:
+                progress = _progress_logger(filename)
+            else:
+                progress = _no_progress
+            
+            try:
+                with open(part_path, file_mode, buffering=config.WRITE_BUFFER_SIZE) as f:
                     for chunk in response.iter_content(chunk_size=config.CHUNK_SIZE):
                         if chunk:
                             f.write(chunk)
+                            hasher.update(chunk)
                             downloaded_size += len(chunk)
+                            progress(len(chunk))
+            finally:
+                if pbar is not None:
+                    pbar.close()
             
             elapsed_time = time.time() - start_time
             speed_mbps = (downloaded_size / (1024 * 1024)) / elapsed_time if elapsed_time > 0 else 0
@@ -109,12 +361,18 @@ def download_file(
                 f"in {elapsed_time:.1f}s ({speed_mbps:.1f} MB/s)"
             )
             
-            # Verify download
-            if verify_download(destination):
+            # Verify download, then move it into place
+            if verify_download(part_path, kind=kind, known_size=resume_from + downloaded_size):
+                part_path.replace(destination)
+                validator_path.unlink(missing_ok=True)
+                _sha256_sidecar(destination).write_text(hasher.hexdigest())
+                if validators is not None:
+                    validators['etag'] = response.headers.get('ETag')
+                    validators['last_modified'] = response.headers.get('Last-Modified')
                 return True
             else:
                 logger.warning(f"Downloaded file failed verification: {destination}")
-                destination.unlink(missing_ok=True)
+                _discard_part(part_path)
                 
         except requests.exceptions.Timeout:
             logger.warning(f"Download timeout on attempt {attempt}/{max_retries}")
@@ -122,7 +380,11 @@ def download_file(
             logger.error(f"HTTP error {e.response.status_code}: {e}")
             if e.response.status_code == 404:
                 logger.error(f"File not found: {url}")
-                return False  # Don't retry on 404
+                return NOT_FOUND  # Don't retry on 404
+            if e.response.status_code == 416:
+                # Stale part file doesn't match the remote file, start over
+                logger.warning(f"Cannot resume {filename}, restarting download")
+                _discard_part(part_path)
             if e.response.status_code >= 500:
                 logger.warning(f"Server error, will retry...")
         except requests.exceptions.RequestException as e:
@@ -130,25 +392,300 @@ def download_file(
         except IOError as e:
             logger.error(f"File I/O error: {e}")
             raise DownloadError(f"Cannot write to {destination}: {e}")
+        finally:
+            # Return the connection to the pool
+            if response is not None:
+                response.close()
         
         # Wait before retry (with exponential backoff)
         if attempt < max_retries:
-            wait_time = config.RETRY_DELAY * (config.RETRY_BACKOFF ** (attempt - 1))
-            logger.info(f"Waiting {wait_time:.1f}s before retry...")
-            time.sleep(wait_time)
+            _wait_before_retry(attempt)
     
     # All retries failed
     logger.error(f"Download failed after {max_retries} attempts: {url}")
     return False
 
 
-def verify_download(file_path: Path, min_size: Optional[int] = None) -> bool:
+def _download_range(
+    url: str,
+    destination: Path,
+    byte_range: Tuple[int, int],
+    validator: Optional[str] = None,
+    max_retries: Optional[int] = None
+) -> int:
+    """
+    Download one byte range of a file into its offset in a preallocated file.
+    
+    A failed attempt is retried from the first byte not yet written, so only
+    the missing part of the range is fetched again.
+    
+    Args:
+        url: URL to download from
+        destination: Preallocated file to write into
+        byte_range: Inclusive (start, end) byte offsets
+        validator: Sent as If-Range so every request reads the same remote
+            version; the server answers 200 instead of 206 once it changes
+        max_retries: Maximum attempts for this range (default from config)
+    
+    Returns:
+        Number of bytes written
+    
+    Raises:
+        requests.exceptions.RequestException: If the range still fails after
+            all retries or the server ignores the Range header
+    """
+    if max_retries is None:
+        max_retries = config.MAX_RETRIES
+    
+    start, end = byte_range
+    expected = end - start + 1
+    written = 0
+    
+    for attempt in range(1, max_retries + 1):
+        headers = {'Range': f'bytes={start + written}-{end}'}
+        if validator:
+            headers['If-Range'] = validator
+        
+        try:
+            with _SESSION.get(
+                url,
+                stream=True,
+                timeout=config.TIMEOUT,
+                headers=headers,
+                verify=False
+            ) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    # Not retryable: the server ignores ranges or the file changed
+                    raise _RangeNotHonoured(
+                        f"Server ignored Range request (status {response.status_code})"
+                    )
+                
+                # Each worker writes through its own handle at its own offset
+                with open(destination, 'r+b', buffering=config.WRITE_BUFFER_SIZE) as f:
+                    f.seek(start + written)
+                    for chunk in response.iter_content(chunk_size=config.CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk[:expected - written])
+                            written = min(expected, written + len(chunk))
+            
+            if written == expected:
+                return written
+            
+            raise requests.exceptions.RequestException(
+                f"Incomplete range {start}-{end}: got {written} of {expected} bytes"
+            )
+        except _RangeNotHonoured:
+            raise
+        except requests.exceptions.RequestException as e:
+            if attempt == max_retries:
+                raise
+            logger.warning(
+                f"Range {start}-{end} failed on attempt {attempt}/{max_retries} "
+                f"at byte {start + written}: {e}"
+            )
+            _wait_before_retry(attempt)
+    
+    return written
+
+
+def download_file_ranged(
+    url: str,
+    destination: Path,
+    n_streams: Optional[int] = None,
+    kind: Optional[str] = None
+) -> bool:
+    """
+    Download a large file over several concurrent HTTP Range requests.
+    
+    Each range retries on its own from where it stopped. Falls back to the
+    single-stream download_file if the server does not advertise byte-range
+    support, a range still fails after its retries, or an interrupted
+    single-stream download is waiting to be resumed. The file is assembled in
+    a .part file and only replaces destination once it passes verification,
+    so a failed download leaves the previous copy intact.
+    
+    Args:
+        url: URL to download from
+        destination: Path where file should be saved
+        n_streams: Number of concurrent streams (default from config)
+        kind: Passed to verify_download before the file replaces destination
+    
+    Returns:
+        True if download successful, False otherwise
+    """
+    if n_streams is None:
+        n_streams = config.RANGE_STREAMS
+    
+    filename = Path(urlparse(url).path).name
+    
+    try:
+        head = _SESSION.head(
+            url,
+            timeout=config.TIMEOUT,
+            allow_redirects=True,
+            verify=False
+        )
+        head.raise_for_status()
+        total_size = int(head.headers.get('content-length', 0))
+        accepts_ranges = head.headers.get('accept-ranges', '').lower() == 'bytes'
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.warning(f"HEAD request failed for {filename}: {e}")
+        return download_file(url, destination, kind=kind) is True
+    
+    if not accepts_ranges or total_size < n_streams * config.CHUNK_SIZE:
+        logger.info(f"Ranged download not supported for {filename}, using single stream")
+        return download_file(url, destination, kind=kind) is True
+    
+    _ensure_dir(destination.parent)
+    part_path = destination.with_suffix(destination.suffix + '.part')
+    
+    # A single-stream part with its validator record is left by an interrupted
+    # fallback; resuming it fetches only the missing bytes
+    if part_path.exists() and _resume_validator_path(part_path).exists():
+        logger.info(f"Resuming interrupted download of {filename} in a single stream")
+        return download_file(url, destination, kind=kind) is True
+    
+    validator = _if_range_validator(head)
+    
+    # Split into contiguous inclusive byte ranges
+    part_size = total_size // n_streams
+    ranges = [
+        (i * part_size, total_size - 1 if i == n_streams - 1 else (i + 1) * part_size - 1)
+        for i in range(n_streams)
+    ]
+    
+    logger.info(
+        f"Downloading {filename} in {n_streams} parallel streams "
+        f"({total_size / (1024 * 1024):.1f} MB)..."
+    )
+    start_time = time.time()
+    
+    try:
+        # Drop any leftover ranged part first: it has no validator record,
+        # so there is no way to tell which bytes in it are real
+        _discard_part(part_path)
+        
+        # Preallocate so every worker can write at its own offset
+        with open(part_path, 'wb') as f:
+            f.truncate(total_size)
+        
+        with ThreadPoolExecutor(max_workers=n_streams) as executor:
+            downloaded_size = sum(
+                executor.map(lambda r: _download_range(url, part_path, r, validator), ranges)
+            )
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Ranged download failed ({e}), falling back to single stream")
+        # The preallocated part file has holes, so download_file must not resume it
+        _discard_part(part_path)
+        return download_file(url, destination, kind=kind) is True
+    except IOError as e:
+        _discard_part(part_path)
+        logger.error(f"File I/O error: {e}")
+        raise DownloadError(f"Cannot write to {destination}: {e}")
+    
+    elapsed_time = time.time() - start_time
+    speed_mbps = (downloaded_size / (1024 * 1024)) / elapsed_time if elapsed_time > 0 else 0
+    
+    logger.info(
+        f"Download completed: {downloaded_size / (1024 * 1024):.1f} MB "
+        f"in {elapsed_time:.1f}s ({speed_mbps:.1f} MB/s)"
+    )
+    
+    if verify_download(part_path, kind=kind, known_size=downloaded_size):
+        part_path.replace(destination)
+        return True
+    
+    logger.warning(f"Downloaded file failed verification: {destination}")
+    _discard_part(part_path)
+    return False
+
+
+def close_session() -> None:
+    """Close the shared HTTP session and release pooled connections."""
+    _SESSION.close()
+    logger.debug("HTTP session closed")
+
+
+def compute_sha256(file_path: Path) -> str:
+    """
+    Compute the SHA-256 digest of a file by streaming it in blocks.
+    
+    Args:
+        file_path: Path to file
+    
+    Returns:
+        Hex digest string
+    """
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while block := f.read(config.HASH_BLOCK_SIZE):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _sha256_sidecar(file_path: Path) -> Path:
+    """Path of the file holding a download's SHA-256 digest."""
+    return file_path.with_suffix(file_path.suffix + '.sha256')
+
+
+def get_sha256(file_path: Path) -> str:
+    """
+    Get the SHA-256 digest of a file, reusing the digest from download_file.
+    
+    The digest recorded by download_file is only trusted if it is at least as
+    new as the file itself; otherwise the file is hashed and the record updated.
+    
+    Args:
+        file_path: Path to file
+    
+    Returns:
+        Hex digest string
+    """
+    sidecar = _sha256_sidecar(file_path)
+    try:
+        if sidecar.stat().st_mtime_ns >= file_path.stat().st_mtime_ns:
+            return sidecar.read_text().strip()
+    except FileNotFoundError:
+        pass
+    
+    digest = compute_sha256(file_path)
+    sidecar.write_text(digest)
+    return digest
+
+
+def compute_zip_crc(zip_path: Path) -> int:
+    """
+    Fingerprint a ZIP archive from the CRC32s stored in its central directory.
+    
+    Only the central directory is read, so this is cheap even for PPR-ALL.zip.
+    
+    Args:
+        zip_path: Path to ZIP file
+    
+    Returns:
+        Sum of member CRC32 values, truncated to 32 bits
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        return sum(info.CRC for info in zip_ref.infolist()) & 0xFFFFFFFF
+
+
+def verify_download(
+    file_path: Path,
+    min_size: Optional[int] = None,
+    kind: Optional[str] = None,
+    known_size: Optional[int] = None
+) -> bool:
     """
     Verify that downloaded file is valid.
     
     Args:
         file_path: Path to downloaded file
         min_size: Minimum expected file size in bytes (default from config)
+        kind: Set to 'zip' to also check every archive member against its
+            stored CRC32, catching truncated or corrupt archives before extraction
+        known_size: File size already tracked by the caller while writing;
+            skips the stat() call when given
     
     Returns:
         True if file is valid, False otherwise
@@ -156,17 +693,32 @@ def verify_download(file_path: Path, min_size: Optional[int] = None) -> bool:
     if min_size is None:
         min_size = config.MIN_FILE_SIZE
     
-    if not file_path.exists():
-        logger.error(f"Downloaded file does not exist: {file_path}")
-        return False
-    
-    file_size = file_path.stat().st_size
+    if known_size is not None:
+        file_size = known_size
+    else:
+        if not file_path.exists():
+            logger.error(f"Downloaded file does not exist: {file_path}")
+            return False
+        
+        file_size = file_path.stat().st_size
     
     if file_size < min_size:
         logger.error(f"Downloaded file too small: {file_size} bytes (min: {min_size})")
         return False
     
-    logger.debug(f"Download verified: {file_path.name} ({file_size} bytes)")
+    if kind == 'zip':
+        try:
+            with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                bad_member = zip_ref.testzip()
+        except zipfile.BadZipFile as e:
+            logger.error(f"Downloaded file is not a valid ZIP archive: {e}")
+            return False
+        
+        if bad_member is not None:
+            logger.error(f"Corrupt member in downloaded archive: {bad_member}")
+            return False
+    
+    logger.debug("Download verified: %s (%d bytes)", file_path.name, file_size)
     return True
 
 
@@ -183,13 +735,14 @@ def download_all_data(destination_dir: Optional[Path] = None) -> Optional[Path]:
     if destination_dir is None:
         destination_dir = config.INITIAL_DIR
     
-    destination_dir.mkdir(parents=True, exist_ok=True)
     destination = destination_dir / "PPR-ALL.zip"
     
     logger.info("Starting download of complete historical dataset (PPR-ALL.zip)")
     logger.info(f"This may take several minutes depending on your connection...")
     
-    success = download_file(config.ALL_DATA_URL, destination)
+    # Check archive integrity now rather than failing midway through
+    # extraction; a corrupt download never replaces the previous archive
+    success = download_file_ranged(config.ALL_DATA_URL, destination, kind='zip')
     
     if success:
         logger.info(f"Successfully downloaded PPR-ALL.zip to {destination}")
@@ -202,8 +755,9 @@ def download_all_data(destination_dir: Optional[Path] = None) -> Optional[Path]:
 def download_monthly_data(
     year: int,
     month: int,
-    destination_dir: Optional[Path] = None
-) -> Optional[Path]:
+    destination_dir: Optional[Path] = None,
+    validators: Optional[Dict] = None
+) -> Union[Path, DownloadStatus, None]:
     """
     Download data for a specific month.
     
@@ -211,31 +765,44 @@ def download_monthly_data(
         year: Year (e.g., 2025)
         month: Month (1-12)
         destination_dir: Directory to save file (default: config.MONTHLY_DIR)
+        validators: Cache validators keyed by filename (typically
+            metadata['monthly_validators']); the entry for this month is
+            used for a conditional request and updated after download
     
     Returns:
-        Path to downloaded file if successful, None otherwise
+        Path to downloaded file if new data was downloaded, NOT_MODIFIED or
+        NOT_FOUND if the server has nothing new, None if the download failed
     """
     if destination_dir is None:
         destination_dir = config.MONTHLY_DIR
     
-    destination_dir.mkdir(parents=True, exist_ok=True)
-    
     # Format filename
     filename = f"PPR-{year}-{month:02d}.csv"
     destination = destination_dir / filename
     
     # Format URL
-    url = config.MONTHLY_URL_PATTERN.format(year=year, month=month)
+    url = config.monthly_url(year, month)
     
-    logger.info(f"Downloading monthly data: {year}-{month:02d}")
+    logger.info("Downloading monthly data: %d-%02d", year, month)
     
-    success = download_file(url, destination)
+    file_validators = None
+    if validators is not None:
+        file_validators = dict(validators.get(filename, {}))
     
-    if success:
-        logger.info(f"Successfully downloaded {filename}")
+    success = download_file(url, destination, validators=file_validators)
+    
+    if success is NOT_MODIFIED:
+        return NOT_MODIFIED
+    elif success is NOT_FOUND:
+        logger.info("%s is not published yet", filename)
+        return NOT_FOUND
+    elif success is True:
+        if validators is not None:
+            validators[filename] = file_validators
+        logger.info("Successfully downloaded %s", filename)
         return destination
     else:
-        logger.warning(f"Failed to download {filename} (may not exist yet)")
+        logger.warning("Failed to download %s", filename)
         return None
 
 
@@ -260,24 +827,22 @@ def download_county_data(
     if destination_dir is None:
         destination_dir = config.MONTHLY_DIR
     
-    destination_dir.mkdir(parents=True, exist_ok=True)
-    
     # Format filename
     filename = f"PPR-{year}-{month:02d}-{county}.csv"
     destination = destination_dir / filename
     
     # Format URL
-    url = config.COUNTY_URL_PATTERN.format(year=year, month=month, county=county)
+    url = config.county_url(year, month, county)
     
-    logger.info(f"Downloading county data: {county}, {year}-{month:02d}")
+    logger.info("Downloading county data: %s, %d-%02d", county, year, month)
     
     success = download_file(url, destination)
     
-    if success:
-        logger.info(f"Successfully downloaded {filename}")
+    if success is True:
+        logger.info("Successfully downloaded %s", filename)
         return destination
     else:
-        logger.warning(f"Failed to download {filename}")
+        logger.warning("Failed to download %s", filename)
         return None
 
 
@@ -292,7 +857,7 @@ if __name__ == "__main__":
     month = now.month - 1 if now.month > 1 else 12
     
     test_file = download_monthly_data(year, month)
-    if test_file:
+    if isinstance(test_file, Path):
         logger.info(f"Test successful! Downloaded: {test_file}")
     else:
         logger.error("Test failed!")
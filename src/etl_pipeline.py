@@ -14,11 +14,13 @@ Usage:
     python etl_pipeline.py --mode incremental # Force incremental update
     python etl_pipeline.py --force-full       # Re-download everything
     python etl_pipeline.py --verbose          # Debug logging
+    python etl_pipeline.py --keep-extracted   # Keep extracted CSVs on disk
 """
 
 import argparse
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple
@@ -27,19 +29,35 @@ from typing import Dict, Optional, Tuple
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import config
-from downloader import download_all_data, download_monthly_data
-from extractor import extract_and_validate_all, get_all_csv_files
+from downloader import (
+    NOT_FOUND,
+    NOT_MODIFIED,
+    close_session,
+    compute_zip_crc,
+    download_all_data,
+    download_monthly_data,
+    get_sha256,
+)
+from extractor import (
+    extract_and_validate_all,
+    get_all_csv_files,
+    list_csv_members,
+    stream_zip_members,
+)
 from logger_config import cleanup_old_logs, get_logger
 from merger import (
     generate_data_summary,
     load_existing_data,
     merge_datasets,
+    merge_datasets_by_year,
+    merge_datasets_streaming,
     save_consolidated_data,
 )
 from metadata import (
     get_months_to_update,
     get_pipeline_status,
     load_metadata,
+    load_metadata_summary,
     save_metadata,
     update_metadata_after_run,
 )
@@ -47,10 +65,15 @@ from metadata import (
 logger = get_logger(__name__)
 
 
-def run_initial_load() -> Dict:
+def run_initial_load(use_cache: bool = True, keep_extracted: bool = False) -> Dict:
     """
     Perform initial bulk download and processing of all historical data.
     
+    Args:
+        use_cache: Skip processing if PPR-ALL.zip is unchanged since the last run
+        keep_extracted: Extract CSVs to disk before merging instead of reading
+            them straight from the archive (useful for debugging)
+    
     Returns:
         Dictionary with run summary
     """
@@ -77,21 +100,54 @@ def run_initial_load() -> Dict:
             run_info['errors'].append(error_msg)
             return run_info
         
-        # Step 2: Extract all CSV files
-        logger.info("\n[STEP 2/4] Extracting CSV files from archive...")
-        csv_files = extract_and_validate_all(zip_file, config.INITIAL_DIR)
+        # Skip extract/merge/save if the archive is byte-identical to the last run
+        zip_sha256 = get_sha256(zip_file)
+        zip_crc = compute_zip_crc(zip_file)
+        run_info['zip_sha256'] = zip_sha256
+        run_info['zip_crc'] = zip_crc
         
-        if not csv_files:
+        if use_cache and config.CONSOLIDATED_FILE.exists():
+            metadata = load_metadata()
+            if (metadata.get('initial_zip_crc') == zip_crc
+                    and metadata.get('initial_zip_sha256') == zip_sha256):
+                logger.info("PPR-ALL.zip unchanged since last run - skipping processing")
+                run_info['status'] = 'success'
+                run_info['cache_hit'] = True
+                return run_info
+        
+        if keep_extracted:
+            # Step 2: Extract all CSV files
+            logger.info("\n[STEP 2/4] Extracting CSV files from archive...")
+            csv_files = list(extract_and_validate_all(zip_file, config.INITIAL_DIR))
+            csv_names = [f.name for f in csv_files]
+        else:
+            # Step 2: Read CSV members directly from the archive (no extraction)
+            logger.info("\n[STEP 2/4] Listing CSV files in archive...")
+            csv_names = [Path(name).name for name in list_csv_members(zip_file)]
+        
+        if not csv_names:
             error_msg = "No valid CSV files found in archive"
             logger.error(error_msg)
             run_info['errors'].append(error_msg)
             return run_info
         
-        logger.info(f"Extracted and validated {len(csv_files)} CSV files")
+        logger.info(f"Found {len(csv_names)} CSV files")
         
-        # Step 3: Merge all data
+        # Step 3: Merge all data, noting which files were actually loaded
         logger.info("\n[STEP 3/4] Merging all CSV files...")
-        merged_data = merge_datasets(existing=None, new_files=csv_files)
+        loaded_files = []
+        if keep_extracted:
+            merged_data = merge_datasets(
+                existing=None,
+                new_files=csv_files,
+                loaded_files=loaded_files
+            )
+        else:
+            merged_data = merge_datasets_streaming(
+                existing=None,
+                new_streams=stream_zip_members(zip_file),
+                loaded_files=loaded_files
+            )
         
         # Step 4: Save consolidated dataset
         logger.info("\n[STEP 4/4] Saving consolidated dataset...")
@@ -104,9 +160,7 @@ def run_initial_load() -> Dict:
         run_info['status'] = 'success'
         run_info['total_records'] = len(merged_data)
         run_info['data_summary'] = summary
-        run_info['files_processed'] = [
-            {'filename': f.name, 'record_count': 0} for f in csv_files
-        ]
+        run_info['files_processed'] = loaded_files
         
         # Determine latest month from data
         if summary['latest_date']:
@@ -167,22 +221,54 @@ def run_incremental_update(months_to_download: Optional[list] = None) -> Dict:
             run_info['message'] = 'Already up to date'
             return run_info
         
+        # Newest first: it is the month most likely to be unpublished, so an
+        # idle cron run finds out with its first request
+        months_to_download = sorted(months_to_download, reverse=True)
+        
         # Step 1: Download monthly files
         logger.info(f"\n[STEP 1/3] Downloading {len(months_to_download)} monthly files...")
         downloaded_files = []
+        unchanged_count = 0
+        
+        # ETag/Last-Modified from previous runs let unchanged months skip the transfer
+        validators = metadata.setdefault('monthly_validators', {})
         
-        for year, month in months_to_download:
-            logger.info(f"Downloading {year}-{month:02d}...")
-            file_path = download_monthly_data(year, month)
+        # Months are independent and network-bound, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=config.MAX_DOWNLOAD_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(
+                    download_monthly_data, year, month, validators=validators
+                ): (year, month)
+                for year, month in months_to_download
+            }
             
-            if file_path:
-                downloaded_files.append(file_path)
-                run_info['files_processed'].append({
-                    'filename': file_path.name,
-                    'record_count': 0
-                })
-            else:
-                logger.warning(f"Could not download {year}-{month:02d} (may not be available yet)")
+            for future in as_completed(futures):
+                year, month = futures[future]
+                result = future.result()
+                
+                if isinstance(result, Path):
+                    downloaded_files.append(result)
+                elif result in (NOT_FOUND, NOT_MODIFIED):
+                    unchanged_count += 1
+                    logger.info(f"No new data for {year}-{month:02d} (not available yet or unchanged)")
+                else:
+                    logger.warning(f"Failed to download {year}-{month:02d}")
+        
+        run_info['monthly_validators'] = validators
+        
+        # Restore chronological order (filenames are PPR-YYYY-MM.csv)
+        downloaded_files.sort()
+        run_info['files_processed'] = [
+            {'filename': f.name, 'record_count': 0} for f in downloaded_files
+        ]
+        
+        # Only a month the server says is unpublished or unchanged means
+        # there is nothing to do; a failed download is reported as partial
+        if not downloaded_files and unchanged_count == len(months_to_download) == 1:
+            logger.info("No new data available")
+            run_info['status'] = 'success'
+            run_info['message'] = 'Already up to date'
+            return run_info
         
         if not downloaded_files:
             error_msg = "No monthly files could be downloaded"
@@ -193,26 +279,32 @@ def run_incremental_update(months_to_download: Optional[list] = None) -> Dict:
         
         logger.info(f"Successfully downloaded {len(downloaded_files)} files")
         
-        # Step 2: Load existing data and merge
+        # Step 2: Load the affected years of existing data and merge
         logger.info("\n[STEP 2/3] Merging with existing dataset...")
-        existing_data = load_existing_data()
-        
-        if existing_data is None:
+        if not config.CONSOLIDATED_FILE.exists():
             logger.warning("No existing data found, treating as initial load")
-            merged_data = merge_datasets(existing=None, new_files=downloaded_files)
-        else:
-            merged_data = merge_datasets(existing=existing_data, new_files=downloaded_files)
+        
+        # Only a partitioned dataset can be updated a few years at a time
+        partial = config.CONSOLIDATED_FILE.is_dir()
+        merged_data = merge_datasets_by_year(downloaded_files)
         
         # Step 3: Save updated dataset
         logger.info("\n[STEP 3/3] Saving updated dataset...")
-        save_consolidated_data(merged_data, backup=True)
+        save_consolidated_data(merged_data, backup=True, partial=partial)
         
-        # Generate summary
-        summary = generate_data_summary(merged_data)
+        # Generate summary over the whole dataset, reading only the columns it needs
+        if partial:
+            del merged_data
+            summary = generate_data_summary(load_existing_data(columns=[
+                'sale_date', 'price_eur', 'county',
+                'not_full_market_price', 'vat_exclusive'
+            ]))
+        else:
+            summary = generate_data_summary(merged_data)
         
         # Update run info
         run_info['status'] = 'success'
-        run_info['total_records'] = len(merged_data)
+        run_info['total_records'] = summary['total_records']
         run_info['data_summary'] = summary
         
         # Determine latest month
@@ -245,8 +337,7 @@ def determine_execution_mode() -> str:
     Returns:
         'initial' or 'incremental'
     """
-    metadata = load_metadata()
-    status = get_pipeline_status(metadata)
+    status = get_pipeline_status(load_metadata_summary())
     
     if status['needs_initial_load']:
         logger.info("No existing data found - will perform initial load")
@@ -259,7 +350,8 @@ def determine_execution_mode() -> str:
 def run_pipeline(
     mode: str = 'auto',
     force_full: bool = False,
-    verbose: bool = False
+    verbose: bool = False,
+    keep_extracted: bool = False
 ) -> Dict:
     """
     Main entry point for ETL pipeline.
@@ -268,6 +360,7 @@ def run_pipeline(
         mode: 'auto', 'initial', or 'incremental'
         force_full: Force full re-download even if data exists
         verbose: Enable debug logging
+        keep_extracted: Extract PPR-ALL.zip to disk instead of streaming it
     
     Returns:
         Dictionary with execution summary
@@ -299,7 +392,10 @@ def run_pipeline(
     
     # Execute pipeline
     if mode == 'initial' or force_full:
-        run_info = run_initial_load()
+        run_info = run_initial_load(
+            use_cache=not force_full,
+            keep_extracted=keep_extracted
+        )
     elif mode == 'incremental':
         run_info = run_incremental_update()
     else:
@@ -313,6 +409,9 @@ def run_pipeline(
         metadata = update_metadata_after_run(metadata, run_info)
         save_metadata(metadata)
     
+    # Release pooled HTTP connections
+    close_session()
+    
     # Final summary
     logger.info("\n" + "=" * 80)
     logger.info("PIPELINE EXECUTION SUMMARY")
@@ -346,6 +445,7 @@ Examples:
   python etl_pipeline.py --mode incremental # Force incremental update
   python etl_pipeline.py --force-full       # Re-download everything
   python etl_pipeline.py --verbose          # Debug logging
+  python etl_pipeline.py --keep-extracted   # Keep extracted CSVs on disk
         """
     )
     
@@ -368,13 +468,20 @@ Examples:
         help='Enable debug logging'
     )
     
+    parser.add_argument(
+        '--keep-extracted',
+        action='store_true',
+        help='Extract CSV files to disk during initial load (for debugging)'
+    )
+    
     args = parser.parse_args()
     
     # Run pipeline
     result = run_pipeline(
         mode=args.mode,
         force_full=args.force_full,
-        verbose=args.verbose
+        verbose=args.verbose,
+        keep_extracted=args.keep_extracted
     )
     
     # Exit with appropriate code
@@ -4,9 +4,14 @@ Extraction module for Irish Property Price Register ETL Pipeline.
 Handles ZIP file extraction, CSV validation, and file metadata extraction.
 """
 
+import csv
+import os
+import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
@@ -21,6 +26,14 @@ class ExtractionError(Exception):
     pass
 
 
+def _csv_infos(zip_ref: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """Return the ZipInfo entries of all CSV files in an open archive."""
+    return [
+        info for info in zip_ref.infolist()
+        if info.filename.lower().endswith('.csv') and not info.is_dir()
+    ]
+
+
 def extract_zip(zip_path: Path, extract_to: Optional[Path] = None) -> List[Path]:
     """
     Extract all CSV files from a ZIP archive.
@@ -32,6 +45,23 @@ def extract_zip(zip_path: Path, extract_to: Optional[Path] = None) -> List[Path]
     Returns:
         List of paths to extracted CSV files
     
+    Raises:
+        ExtractionError: If extraction fails
+    """
+    return list(_iter_extract_zip(zip_path, extract_to))
+
+
+def _iter_extract_zip(zip_path: Path, extract_to: Optional[Path] = None) -> Iterator[Path]:
+    """
+    Extract CSV files from a ZIP archive, yielding each path once it is written.
+    
+    Args:
+        zip_path: Path to ZIP file
+        extract_to: Directory to extract to (default: same as zip file)
+    
+    Yields:
+        Paths to extracted CSV files
+    
     Raises:
         ExtractionError: If extraction fails
     """
@@ -42,35 +72,52 @@ def extract_zip(zip_path: Path, extract_to: Optional[Path] = None) -> List[Path]
     
     logger.info(f"Extracting {zip_path.name}...")
     
-    extracted_files = []
+    extracted_count = 0
     
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Get list of files in zip
-            file_list = zip_ref.namelist()
-            csv_files = [f for f in file_list if f.lower().endswith('.csv')]
+            # Scan the central directory once, keeping ZipInfo objects
+            csv_infos = _csv_infos(zip_ref)
             
-            logger.info(f"Found {len(csv_files)} CSV files in archive")
+            logger.info(f"Found {len(csv_infos)} CSV files in archive")
             
-            # Extract each CSV file
-            for csv_file in csv_files:
+            # Prevent zip slip vulnerability. The target directory is trusted, so
+            # it is resolved once and member paths are checked by pure string
+            # normalization rather than a resolve() per member
+            extract_root = str(extract_to.resolve())
+            prefix = extract_root + os.sep
+            safe_members = []
+            for info in csv_infos:
+                target = os.path.normpath(os.path.join(extract_root, info.filename))
+                if target.startswith(prefix):
+                    safe_members.append((info, target))
+                else:
+                    logger.warning(f"Skipping potentially unsafe path: {info.filename}")
+            
+            # Copy each member straight to disk with a buffer sized to the file
+            for info, target in safe_members:
+                if info.file_size == 0:
+                    logger.debug(f"Skipping empty member: {info.filename}")
+                    continue
+                
+                file_path = Path(target)
                 try:
-                    # Prevent zip slip vulnerability
-                    file_path = (extract_to / csv_file).resolve()
-                    if not file_path.is_relative_to(extract_to.resolve()):
-                        logger.warning(f"Skipping potentially unsafe path: {csv_file}")
-                        continue
-                    
-                    # Extract file
-                    zip_ref.extract(csv_file, extract_to)
-                    extracted_files.append(file_path)
-                    logger.debug(f"Extracted: {csv_file}")
-                    
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    with zip_ref.open(info) as src, open(file_path, 'wb') as dst:
+                        shutil.copyfileobj(
+                            src, dst, min(info.file_size, config.EXTRACT_BUFFER_SIZE)
+                        )
                 except Exception as e:
-                    logger.warning(f"Failed to extract {csv_file}: {e}")
+                    # Continue with other members instead of failing completely
+                    logger.warning(f"Failed to extract {info.filename}: {e}")
+                    file_path.unlink(missing_ok=True)
                     continue
+                
+                extracted_count += 1
+                logger.debug(f"Extracted: {info.filename}")
+                yield file_path
             
-            logger.info(f"Successfully extracted {len(extracted_files)} files to {extract_to}")
+            logger.info(f"Successfully extracted {extracted_count} files to {extract_to}")
             
     except zipfile.BadZipFile as e:
         logger.error(f"Invalid or corrupt ZIP file: {zip_path}")
@@ -78,10 +125,114 @@ def extract_zip(zip_path: Path, extract_to: Optional[Path] = None) -> List[Path]
     except Exception as e:
         logger.error(f"Extraction failed: {e}")
         raise ExtractionError(f"Extraction error: {e}")
+
+
+def extract_all_zips(zip_paths: List[Path], extract_to: Optional[Path] = None) -> List[Path]:
+    """
+    Extract CSV files from several ZIP archives in parallel.
+    
+    zlib releases the GIL while inflating, so threads decompress
+    concurrently. Each task opens its own ZipFile and extracts into its own
+    subdirectory named after the archive, so archives with identically named
+    members never write to the same path.
+    
+    Args:
+        zip_paths: Paths to ZIP files (duplicates are extracted once)
+        extract_to: Directory to create the per-archive subdirectories in
+            (default: next to each zip file)
+    
+    Returns:
+        List of paths to extracted CSV files, in archive order
+    """
+    # One target directory per archive; an archive whose name collides with
+    # an earlier one's is skipped rather than extracted over it
+    targets: Dict[Path, Path] = {}
+    for zip_path in dict.fromkeys(zip_paths):
+        target = (extract_to if extract_to is not None else zip_path.parent) / zip_path.stem
+        if target in targets.values():
+            logger.warning(f"Skipping {zip_path}: its extraction directory {target} is already used")
+            continue
+        targets[zip_path] = target
+    
+    if not targets:
+        return []
+    
+    workers = min(config.MAX_EXTRACT_WORKERS, os.cpu_count() or 1, len(targets))
+    
+    extracted_files = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            zip_path: executor.submit(extract_zip, zip_path, target)
+            for zip_path, target in targets.items()
+        }
+        
+        for zip_path, future in futures.items():
+            try:
+                extracted_files.extend(future.result())
+            except ExtractionError as e:
+                # Continue with other archives instead of failing completely
+                logger.warning(f"Skipping {zip_path.name}: {e}")
     
     return extracted_files
 
 
+def sniff_encoding(head: bytes) -> Optional[str]:
+    """
+    Pick the encoding of a PPR CSV from its first bytes.
+    
+    A UTF-8 file also decodes as Windows-1252, turning the Euro sign in the
+    price header into mojibake ("Price (â‚¬)"), so the first encoding that
+    decodes the price header correctly wins.
+    
+    Args:
+        head: Leading bytes of the file
+    
+    Returns:
+        Encoding name, or None if no candidate encoding can decode the bytes
+    """
+    # Drop a possibly truncated multi-byte character after the last full line
+    last_newline = head.rfind(b'\n')
+    if last_newline >= 0:
+        head = head[:last_newline + 1]
+    
+    fallback = None
+    for encoding in config.CSV_ENCODINGS:
+        try:
+            text = head.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        if config.PRICE_COLUMN in text:
+            return encoding
+        if fallback is None:
+            fallback = encoding
+    
+    return fallback
+
+
+@lru_cache(maxsize=None)
+def _detect_encoding_cached(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """Sniff a file's encoding; cached per (path, mtime, size)."""
+    with open(path, 'rb') as f:
+        return sniff_encoding(f.read(config.ENCODING_SNIFF_BYTES))
+
+
+def detect_encoding(csv_path: Path) -> Optional[str]:
+    """
+    Detect the encoding of a CSV file from its first few KB.
+    
+    Results are memoized per file version, so validation, info and loading
+    of the same file sniff it only once.
+    
+    Args:
+        csv_path: Path to CSV file
+    
+    Returns:
+        Encoding name, or None if the file cannot be decoded
+    """
+    stat = csv_path.stat()
+    return _detect_encoding_cached(str(csv_path), stat.st_mtime_ns, stat.st_size)
+
+
 def validate_csv_structure(csv_path: Path) -> bool:
     """
     Validate that a CSV file has the expected structure.
@@ -93,21 +244,22 @@ def validate_csv_structure(csv_path: Path) -> bool:
         True if valid, False otherwise
     """
     try:
-        # Read just the header - try different encodings
-        encodings = ['windows-1252', 'iso-8859-1', 'utf-8']
-        df = None
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(csv_path, nrows=0, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
+        encoding = detect_encoding(csv_path)
         
-        if df is None:
+        if encoding is None:
             logger.warning(f"Could not decode {csv_path.name} with any standard encoding")
             return False
         
-        columns = df.columns.tolist()
+        # Read just the header line - no need to spin up a CSV parser
+        with open(csv_path, 'rb') as f:
+            raw_header = f.readline()
+        
+        if not raw_header.strip():
+            logger.warning(f"CSV file is empty: {csv_path.name}")
+            return False
+        
+        header = raw_header.decode(encoding).lstrip('\ufeff').rstrip('\r\n')
+        columns = next(csv.reader([header]))
         
         # Check if all expected columns are present
         missing_columns = set(config.EXPECTED_COLUMNS) - set(columns)
@@ -128,10 +280,7 @@ def validate_csv_structure(csv_path: Path) -> bool:
         logger.debug(f"CSV structure validated: {csv_path.name}")
         return True
         
-    except pd.errors.EmptyDataError:
-        logger.warning(f"CSV file is empty: {csv_path.name}")
-        return False
-    except pd.errors.ParserError as e:
+    except (csv.Error, UnicodeDecodeError) as e:
         logger.warning(f"CSV parsing error in {csv_path.name}: {e}")
         return False
     except Exception as e:
@@ -153,59 +302,49 @@ def get_csv_info(csv_path: Path) -> Optional[Dict]:
         # Get file size
         file_size = csv_path.stat().st_size
         
-        # Read CSV to get row count and date range
-        # Use chunks for large files
-        row_count = 0
-        earliest_date = None
-        latest_date = None
+        # Count rows with a raw byte scan - no parsing or per-row objects
+        newlines = 0
+        last_byte = b'\n'
+        with open(csv_path, 'rb') as f:
+            while block := f.read(config.SCAN_BLOCK_SIZE):
+                newlines += block.count(b'\n')
+                last_byte = block[-1:]
         
-        # Try different encodings
-        encodings = ['windows-1252', 'iso-8859-1', 'utf-8']
-        csv_encoding = None
-        for encoding in encodings:
-            try:
-                test_chunk = pd.read_csv(csv_path, encoding=encoding, nrows=1)
-                csv_encoding = encoding
-                break
-            except UnicodeDecodeError:
-                continue
+        # Header line doesn't count; a final line without a newline does
+        row_count = max(newlines - 1 + (last_byte != b'\n'), 0)
+        
+        csv_encoding = detect_encoding(csv_path)
         
         if csv_encoding is None:
             logger.error(f"Could not determine encoding for {csv_path.name}")
             return None
         
-        for chunk in pd.read_csv(
-            csv_path,
-            encoding=csv_encoding,
-            chunksize=config.CSV_CHUNK_SIZE,
-            usecols=['Date of Sale (dd/mm/yyyy)'],
-            parse_dates=False  # We'll parse manually for safety
-        ):
-            row_count += len(chunk)
+        # Date range from a single read of the date column; cache=True converts
+        # each distinct date string once instead of once per row
+        earliest_date = None
+        latest_date = None
+        try:
+            date_col = pd.read_csv(
+                csv_path,
+                encoding=csv_encoding,
+                usecols=['Date of Sale (dd/mm/yyyy)'],
+                dtype=str  # Parse manually for safety
+            )['Date of Sale (dd/mm/yyyy)']
             
-            # Try to find date range
-            try:
-                # Convert dates
-                dates = pd.to_datetime(
-                    chunk['Date of Sale (dd/mm/yyyy)'],
-                    format='%d/%m/%Y',
-                    errors='coerce'
-                )
-                
-                chunk_earliest = dates.min()
-                chunk_latest = dates.max()
-                
-                if pd.notna(chunk_earliest):
-                    if earliest_date is None or chunk_earliest < earliest_date:
-                        earliest_date = chunk_earliest
+            date_range = pd.to_datetime(
+                date_col,
+                format='%d/%m/%Y',
+                errors='coerce',
+                cache=True
+            ).agg(['min', 'max'])
+            
+            if pd.notna(date_range['min']):
+                earliest_date = date_range['min']
+            if pd.notna(date_range['max']):
+                latest_date = date_range['max']
                 
-                if pd.notna(chunk_latest):
-                    if latest_date is None or chunk_latest > latest_date:
-                        latest_date = chunk_latest
-                        
-            except Exception as e:
-                logger.debug(f"Could not parse dates in {csv_path.name}: {e}")
-                continue
+        except Exception as e:
+            logger.debug(f"Could not parse dates in {csv_path.name}: {e}")
         
         metadata = {
             'filename': csv_path.name,
@@ -229,37 +368,92 @@ def get_csv_info(csv_path: Path) -> Optional[Dict]:
         return None
 
 
-def extract_and_validate_all(zip_path: Path, extract_to: Optional[Path] = None) -> List[Path]:
+def extract_and_validate_all(zip_path: Path, extract_to: Optional[Path] = None) -> Iterator[Path]:
     """
     Extract ZIP and validate all CSV files.
     
+    Each file is validated right after it is extracted, while it is still in
+    the page cache, rather than in a second pass over all files.
+    
     Args:
         zip_path: Path to ZIP file
         extract_to: Directory to extract to (default: same as zip file)
     
-    Returns:
-        List of valid CSV file paths
+    Yields:
+        Valid CSV file paths
+    
+    Raises:
+        ExtractionError: If extraction fails
     """
     logger.info(f"Extracting and validating {zip_path.name}...")
     
-    # Extract all files
-    extracted_files = extract_zip(zip_path, extract_to)
-    
-    if not extracted_files:
-        logger.warning("No files were extracted")
-        return []
+    extracted_count = 0
+    valid_count = 0
     
-    # Validate each file
-    valid_files = []
-    for csv_file in extracted_files:
+    for csv_file in _iter_extract_zip(zip_path, extract_to):
+        extracted_count += 1
         if validate_csv_structure(csv_file):
-            valid_files.append(csv_file)
+            valid_count += 1
+            yield csv_file
         else:
             logger.warning(f"Skipping invalid CSV: {csv_file.name}")
     
-    logger.info(f"Validated {len(valid_files)} out of {len(extracted_files)} files")
+    if not extracted_count:
+        logger.warning("No files were extracted")
+        return
+    
+    logger.info(f"Validated {valid_count} out of {extracted_count} files")
+
+
+def list_csv_members(zip_path: Path) -> List[str]:
+    """
+    List the CSV members of a ZIP archive without extracting them.
+    
+    Args:
+        zip_path: Path to ZIP file
+    
+    Returns:
+        List of CSV member names
     
-    return valid_files
+    Raises:
+        ExtractionError: If the archive cannot be read
+    """
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            return [info.filename for info in _csv_infos(zip_ref)]
+    except zipfile.BadZipFile as e:
+        logger.error(f"Invalid or corrupt ZIP file: {zip_path}")
+        raise ExtractionError(f"Bad ZIP file: {e}")
+
+
+def stream_zip_members(zip_path: Path) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Yield open file objects for each CSV member of a ZIP archive.
+    
+    Members are decompressed on the fly as they are read, so nothing is
+    written to disk. Each file object is closed once the caller advances
+    to the next member.
+    
+    Args:
+        zip_path: Path to ZIP file
+    
+    Yields:
+        (member name, binary file object) tuples
+    
+    Raises:
+        ExtractionError: If the archive cannot be read
+    """
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            csv_infos = _csv_infos(zip_ref)
+            logger.info(f"Streaming {len(csv_infos)} CSV files from {zip_path.name}")
+            
+            for info in csv_infos:
+                with zip_ref.open(info, 'r') as member:
+                    yield info.filename, member
+    except zipfile.BadZipFile as e:
+        logger.error(f"Invalid or corrupt ZIP file: {zip_path}")
+        raise ExtractionError(f"Bad ZIP file: {e}")
 
 
 def get_all_csv_files(directory: Path) -> List[Path]:
@@ -276,10 +470,14 @@ def get_all_csv_files(directory: Path) -> List[Path]:
         logger.warning(f"Directory does not exist: {directory}")
         return []
     
-    csv_files = list(directory.glob("*.csv"))
-    logger.debug(f"Found {len(csv_files)} CSV files in {directory}")
+    # DirEntry caches its type from the directory listing, so no stat per file
+    with os.scandir(directory) as it:
+        entries = [e for e in it if e.name.lower().endswith('.csv') and e.is_file()]
+    entries.sort(key=lambda e: e.name)
+    
+    logger.debug(f"Found {len(entries)} CSV files in {directory}")
     
-    return sorted(csv_files)
+    return [Path(e.path) for e in entries]
 
 
 if __name__ == "__main__":
@@ -4,41 +4,37 @@ Logging configuration for Irish Property Price Register ETL Pipeline.
 Provides centralized logging setup with file rotation and console output.
 """
 
+import atexit
 import logging
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from config import config
 
 
-def setup_logger(
-    name: str,
-    level: int = logging.INFO,
-    log_to_file: bool = True,
-    log_to_console: bool = True
-) -> logging.Logger:
+# One queue handler per distinct handler configuration, shared by every
+# logger that uses it. Formatting and writing happen on a listener thread so
+# logging calls only pay for a queue put.
+_queue_handlers: Dict[Tuple[int, bool, bool], Tuple[QueueHandler, QueueListener]] = {}
+
+
+def _build_handlers(level: int, log_to_file: bool, log_to_console: bool) -> List[logging.Handler]:
     """
-    Configure and return a logger instance.
+    Create the console and file handlers that the listener writes to.
     
     Args:
-        name: Name of the logger (typically module name)
-        level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        level: Logging level for the handlers
         log_to_file: Whether to write logs to file
         log_to_console: Whether to write logs to console
     
     Returns:
-        Configured logger instance
+        List of configured handlers
     """
-    logger = logging.getLogger(name)
-    
-    # Prevent duplicate handlers if logger already configured
-    if logger.handlers:
-        return logger
-    
-    logger.setLevel(level)
-    logger.propagate = False
+    handlers = []
     
     # Create formatter
     formatter = logging.Formatter(
@@ -51,7 +47,7 @@ def setup_logger(
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(level)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
     
     # File handler
     if log_to_file:
@@ -64,10 +60,81 @@ def setup_logger(
         )
         log_path = config.LOGS_DIR / log_filename
         
-        file_handler = logging.FileHandler(log_path, encoding='utf-8')
+        # Opened on first write; records are buffered and written in batches,
+        # with errors flushed immediately
+        rotating_handler = RotatingFileHandler(
+            log_path,
+            maxBytes=config.LOG_MAX_BYTES,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
+        rotating_handler.setFormatter(formatter)
+        
+        file_handler = MemoryHandler(
+            config.LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=rotating_handler,
+            flushOnClose=True
+        )
         file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        atexit.register(file_handler.close)
+        handlers.append(file_handler)
+    
+    return handlers
+
+
+def _get_queue_handler(level: int, log_to_file: bool, log_to_console: bool) -> QueueHandler:
+    """Return the shared queue handler for a configuration, starting its listener."""
+    key = (level, log_to_file, log_to_console)
+    
+    if key not in _queue_handlers:
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(
+            log_queue,
+            *_build_handlers(level, log_to_file, log_to_console),
+            respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        _queue_handlers[key] = (QueueHandler(log_queue), listener)
+    
+    return _queue_handlers[key][0]
+
+
+def setup_logger(
+    name: str,
+    level: int = logging.INFO,
+    log_to_file: bool = True,
+    log_to_console: bool = True
+) -> logging.Logger:
+    """
+    Configure and return a logger instance.
+    
+    Args:
+        name: Name of the logger (typically module name)
+        level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_to_file: Whether to write logs to file
+        log_to_console: Whether to write logs to console
+    
+    Returns:
+        Configured logger instance
+    """
+    logger = logging.getLogger(name)
+    
+    # Already configured by an earlier call
+    if getattr(logger, '_ppr_configured', False):
+        return logger
+    
+    # Prevent duplicate handlers if logger configured elsewhere
+    if not logger.handlers:
+        logger.setLevel(level)
+        logger.propagate = False
+        
+        if log_to_file or log_to_console:
+            logger.addHandler(_get_queue_handler(level, log_to_file, log_to_console))
+    
+    logger._ppr_configured = True
     
     return logger
 
@@ -88,7 +155,8 @@ def cleanup_old_logs(retention_days: Optional[int] = None) -> None:
     logger = logging.getLogger(__name__)
     now = datetime.now()
     
-    for log_file in config.LOGS_DIR.glob("etl_pipeline_*.log"):
+    # Include rotated backups (etl_pipeline_<date>.log.1, ...)
+    for log_file in config.LOGS_DIR.glob("etl_pipeline_*.log*"):
         try:
             # Get file modification time
             mtime = datetime.fromtimestamp(log_file.stat().st_mtime)
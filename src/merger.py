@@ -4,32 +4,110 @@ Merger module for Irish Property Price Register ETL Pipeline.
 Handles loading, merging, deduplicating, and saving property price data.
 """
 
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
 
 from config import config
+from extractor import detect_encoding, sniff_encoding
 from logger_config import get_logger
 
 logger = get_logger(__name__)
 
+# Characters stripped from raw price strings (a plain string rather than a
+# compiled pattern so Arrow-backed columns can use Arrow's regex kernel)
+_PRICE_STRIP_PATTERN = r'[€,\s]'
+
+# Compact dtypes for the cleaned dataset: low-cardinality text as category,
+# date parts as the smallest nullable integer that fits. Prices are always
+# float64 so every batch and partition has the same type and keeps the cents
+_COMPACT_DTYPES = {
+    'price_eur': 'float64',
+    'county': 'category',
+    'property_description': 'category',
+    'property_size_category': 'category',
+    'year': 'UInt16',
+    'month': 'UInt8',
+    'quarter': 'UInt8',
+}
+
+# Arrow schema of the consolidated dataset. Every partition is written with it
+# and read back through it, so column types never depend on which batch of
+# data a partition came from
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+_DATASET_SCHEMA = pa.schema([
+    ('sale_date', pa.timestamp('ns')),
+    ('address', pa.string()),
+    ('county', _CATEGORY),
+    ('eircode', pa.string()),
+    ('price_eur', pa.float64()),
+    ('not_full_market_price', pa.bool_()),
+    ('vat_exclusive', pa.bool_()),
+    ('property_description', _CATEGORY),
+    ('property_size_category', _CATEGORY),
+    ('year', pa.uint16()),
+    ('month', pa.uint8()),
+    ('quarter', pa.uint8()),
+])
+
+# The consolidated dataset is a directory of hive-style year=YYYY partitions
+_YEAR_PARTITIONING = ds.partitioning(pa.schema([('year', pa.uint16())]), flavor='hive')
+_NULL_YEAR_PARTITION = 'year=__HIVE_DEFAULT_PARTITION__'
+
 
 class MergerError(Exception):
     """Raised when merge operation fails."""
     pass
 
 
-def load_existing_data(file_path: Optional[Path] = None) -> Optional[pd.DataFrame]:
+def _arrow_string_dtype(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    """types_mapper for to_pandas that keeps string columns Arrow-backed."""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def _upper(col: pd.Series) -> pd.Series:
+    """
+    Upper-case a text column using Arrow's vectorized string kernels.
+    
+    Categorical columns are upper-cased per category by pandas already; any
+    other non-Arrow column is converted to an Arrow string column first.
+    """
+    arrow_backed = (
+        isinstance(col.dtype, pd.ArrowDtype)
+        or getattr(col.dtype, 'storage', None) == 'pyarrow'
+    )
+    if not arrow_backed and not isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype(pd.ArrowDtype(pa.string()))
+    return col.str.upper()
+
+
+def load_existing_data(
+    file_path: Optional[Path] = None,
+    years: Optional[Iterable[Optional[int]]] = None,
+    columns: Optional[List[str]] = None
+) -> Optional[pd.DataFrame]:
     """
     Load existing consolidated dataset.
     
+    Only the requested year partitions and columns are read from disk.
+    
     Args:
-        file_path: Path to consolidated file (default: config.CONSOLIDATED_FILE)
+        file_path: Path to consolidated dataset (default: config.CONSOLIDATED_FILE)
+        years: Sale years to load, None in the list meaning undated rows
+            (default: all years)
+        columns: Columns to load (default: all columns)
     
     Returns:
-        DataFrame if file exists, None otherwise
+        DataFrame if dataset exists, None otherwise
     """
     if file_path is None:
         file_path = config.CONSOLIDATED_FILE
@@ -40,7 +118,29 @@ def load_existing_data(file_path: Optional[Path] = None) -> Optional[pd.DataFram
     
     try:
         logger.info(f"Loading existing data from {file_path.name}...")
-        df = pd.read_parquet(file_path)
+        
+        row_filter = None
+        if years is not None:
+            years = list(years)
+            known_years = [y for y in years if y is not None]
+            row_filter = ds.field('year').isin(known_years)
+            if len(known_years) < len(years):
+                row_filter = row_filter | ds.field('year').is_null()
+        
+        # A legacy single-file dataset keeps year as a regular column; either
+        # way every file is cast to the dataset schema as it is read
+        partitioning = _YEAR_PARTITIONING if file_path.is_dir() else None
+        dataset = ds.dataset(
+            file_path,
+            schema=_DATASET_SCHEMA,
+            format='parquet',
+            partitioning=partitioning
+        )
+        table = dataset.to_table(columns=columns, filter=row_filter)
+        
+        df = table.to_pandas(types_mapper=_arrow_string_dtype)
+        df = df.astype({col: dtype for col, dtype in _COMPACT_DTYPES.items() if col in df})
+        
         logger.info(f"Loaded {len(df):,} records from existing dataset")
         return df
         
@@ -49,12 +149,144 @@ def load_existing_data(file_path: Optional[Path] = None) -> Optional[pd.DataFram
         return None
 
 
-def load_csv_files(csv_files: List[Path]) -> pd.DataFrame:
+def _read_raw_csv(
+    source: Union[Path, BinaryIO],
+    name: str,
+    encoding: Optional[str] = None
+) -> Optional[pa.Table]:
+    """
+    Read a PPR CSV into an Arrow table of strings using its sniffed encoding.
+    
+    If a byte past the sniffed header doesn't decode, the remaining candidate
+    encodings are tried in order. A fallback is only accepted if it still
+    decodes the price column header; otherwise e.g. ISO-8859-1 would turn the
+    Windows-1252 Euro sign into a control character and every price would be
+    lost when files are concatenated.
+    
+    Args:
+        source: CSV file path or seekable binary file object
+        name: Name used for logging
+        encoding: Already-detected encoding (sniffed here if not given)
+    
+    Returns:
+        Arrow table, or None if no encoding could decode the file
+    """
+    if encoding is not None:
+        sniffed = encoding
+    elif isinstance(source, Path):
+        sniffed = detect_encoding(source)
+    else:
+        sniffed = sniff_encoding(source.read(config.ENCODING_SNIFF_BYTES))
+        source.seek(0)
+    
+    if sniffed is None:
+        return None
+    
+    encodings = config.CSV_ENCODINGS[config.CSV_ENCODINGS.index(sniffed):]
+    
+    for candidate in encodings:
+        try:
+            # Arrow's multithreaded block parser, read all as strings initially
+            table = pa_csv.read_csv(
+                source,
+                read_options=pa_csv.ReadOptions(
+                    encoding=candidate,
+                    block_size=config.CSV_BLOCK_SIZE,
+                    use_threads=True
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={col: pa.string() for col in config.EXPECTED_COLUMNS},
+                    strings_can_be_null=True
+                )
+            )
+        except UnicodeDecodeError:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            continue
+        
+        if candidate != sniffed and config.PRICE_COLUMN not in table.column_names:
+            logger.warning(f"Reading {name} as {candidate} loses the price column, rejecting")
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            continue
+        
+        logger.debug(f"Successfully read {name} with {candidate} encoding")
+        return table
+    
+    return None
+
+
+def _read_one_csv(csv_file: Path, encoding: Optional[str]) -> Optional[pa.Table]:
+    """
+    Read a single CSV file; runs in a worker thread.
+    
+    Args:
+        csv_file: CSV file path
+        encoding: Detected encoding, or None if detection failed
+    
+    Returns:
+        Arrow table, or None if the file could not be read
+    """
+    if encoding is None:
+        logger.error(f"Could not decode {csv_file.name} with any standard encoding")
+        return None
+    
+    try:
+        table = _read_raw_csv(csv_file, csv_file.name, encoding)
+    except Exception as e:
+        logger.error(f"Failed to load {csv_file.name}: {e}")
+        return None
+    
+    if table is None:
+        logger.error(f"Could not decode {csv_file.name} with any standard encoding")
+    elif config.PRICE_COLUMN not in table.column_names:
+        # Concatenating it would only add a column of null prices
+        logger.error(f"Skipping {csv_file.name}, price column '{config.PRICE_COLUMN}' not found")
+        return None
+    
+    return table
+
+
+def _concat_tables(tables: List[pa.Table], total_rows: int) -> pd.DataFrame:
+    """
+    Concatenate per-file Arrow tables and convert them to pandas once.
+    
+    Arrow concatenation just collects the existing column chunks, and the
+    Arrow-backed conversion keeps them as-is, so the data is never held twice
+    the way a list of DataFrames plus their pd.concat result would be.
+    
+    Args:
+        tables: Tables to concatenate (emptied on return)
+        total_rows: Total row count, for logging
+    
+    Returns:
+        Concatenated DataFrame with Arrow-backed string columns
+    """
+    logger.info(f"Concatenating {len(tables)} tables ({total_rows:,} total rows)...")
+    
+    # Files with extra or reordered columns are unified by name
+    combined = pa.concat_tables(tables, promote_options='default')
+    tables.clear()
+    
+    # Arrow-backed strings let .str methods run on Arrow kernels
+    combined_df = combined.to_pandas(types_mapper=pd.ArrowDtype)
+    
+    logger.info(f"Successfully loaded {len(combined_df):,} records")
+    
+    return combined_df
+
+
+def load_csv_files(
+    csv_files: List[Path],
+    loaded_files: Optional[List[Dict]] = None
+) -> pd.DataFrame:
     """
     Load multiple CSV files and concatenate them.
     
     Args:
         csv_files: List of CSV file paths
+        loaded_files: If given, a {'filename', 'record_count'} entry is
+            appended for each file that was actually loaded
     
     Returns:
         Concatenated DataFrame
@@ -67,118 +299,177 @@ def load_csv_files(csv_files: List[Path]) -> pd.DataFrame:
     
     logger.info(f"Loading {len(csv_files)} CSV files...")
     
-    dfs = []
+    # Sniff encodings up front (cached, cheap) so workers go straight to parsing
+    readable_files = []
+    encodings = []
+    for csv_file in csv_files:
+        try:
+            encoding = detect_encoding(csv_file)
+        except OSError as e:
+            # Continue with other files instead of failing completely
+            logger.error(f"Failed to load {csv_file.name}: {e}")
+            continue
+        readable_files.append(csv_file)
+        encodings.append(encoding)
+    
+    workers = min(len(readable_files), os.cpu_count() or 1)
+    
+    if workers <= 1:
+        results = list(map(_read_one_csv, readable_files, encodings))
+    else:
+        # Arrow parses without the GIL, and every read shares Arrow's CPU
+        # thread pool, so threads keep small files overlapping without
+        # oversubscribing cores or pickling tables back from worker processes
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_read_one_csv, readable_files, encodings))
+    
+    tables = []
     total_rows = 0
     
-    for csv_file in csv_files:
+    for csv_file, table in zip(readable_files, results):
+        if table is None:
+            # Continue with other files instead of failing completely
+            continue
+        
+        rows = table.num_rows
+        total_rows += rows
+        tables.append(table)
+        if loaded_files is not None:
+            loaded_files.append({'filename': csv_file.name, 'record_count': rows})
+        
+        logger.debug(f"Loaded {csv_file.name}: {rows:,} rows")
+    
+    del results
+    
+    if not tables:
+        raise MergerError("No CSV files could be loaded successfully")
+    
+    return _concat_tables(tables, total_rows)
+
+
+def load_csv_streams(
+    streams: Iterable[Tuple[str, BinaryIO]],
+    loaded_files: Optional[List[Dict]] = None
+) -> pd.DataFrame:
+    """
+    Load CSV data from open binary streams (e.g. ZIP members) and concatenate.
+    
+    Streams whose header lacks the expected PPR columns are skipped.
+    
+    Args:
+        streams: Iterable of (name, binary file object) tuples
+        loaded_files: If given, a {'filename', 'record_count'} entry is
+            appended for each stream that was actually loaded
+    
+    Returns:
+        Concatenated DataFrame
+    
+    Raises:
+        MergerError: If no stream could be loaded
+    """
+    tables = []
+    total_rows = 0
+    
+    for name, stream in streams:
         try:
-            # Try different encodings (Irish government files often use Windows-1252)
-            encodings = ['windows-1252', 'iso-8859-1', 'utf-8']
-            df = None
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(
-                        csv_file,
-                        encoding=encoding,
-                        dtype=str  # Read all as strings initially
-                    )
-                    logger.debug(f"Successfully read {csv_file.name} with {encoding} encoding")
-                    break
-                except UnicodeDecodeError:
-                    continue
+            table = _read_raw_csv(stream, name)
+            
+            if table is None:
+                logger.error(f"Could not decode {name} with any standard encoding")
+                continue
             
-            if df is None:
-                logger.error(f"Could not decode {csv_file.name} with any standard encoding")
+            missing_columns = set(config.EXPECTED_COLUMNS) - set(table.column_names)
+            if missing_columns:
+                logger.warning(f"Skipping {name}, missing columns: {missing_columns}")
                 continue
             
-            rows = len(df)
+            rows = table.num_rows
             total_rows += rows
-            dfs.append(df)
+            tables.append(table)
+            if loaded_files is not None:
+                loaded_files.append({'filename': Path(name).name, 'record_count': rows})
             
-            logger.debug(f"Loaded {csv_file.name}: {rows:,} rows")
+            logger.debug(f"Loaded {name}: {rows:,} rows")
             
         except Exception as e:
-            logger.error(f"Failed to load {csv_file.name}: {e}")
-            # Continue with other files instead of failing completely
+            logger.error(f"Failed to load {name}: {e}")
+            # Continue with other streams instead of failing completely
             continue
     
-    if not dfs:
-        raise MergerError("No CSV files could be loaded successfully")
-    
-    # Concatenate all dataframes
-    logger.info(f"Concatenating {len(dfs)} dataframes ({total_rows:,} total rows)...")
-    combined_df = pd.concat(dfs, ignore_index=True)
-    
-    logger.info(f"Successfully loaded {len(combined_df):,} records")
+    if not tables:
+        raise MergerError("No CSV streams could be loaded successfully")
     
-    return combined_df
+    return _concat_tables(tables, total_rows)
 
 
 def clean_and_convert_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Clean and convert data types for analysis.
     
+    Source columns are popped off ``df`` as they are converted, so the raw
+    frame is consumed rather than copied.
+    
     Args:
-        df: Raw DataFrame
+        df: Raw DataFrame (emptied of its PPR columns on return)
     
     Returns:
         Cleaned DataFrame with proper types
     """
     logger.info("Cleaning and converting data types...")
     
-    df_clean = df.copy()
+    out = {}
     
     # Convert date
+    date_col = df.pop('Date of Sale (dd/mm/yyyy)')
     try:
-        df_clean['sale_date'] = pd.to_datetime(
-            df_clean['Date of Sale (dd/mm/yyyy)'],
+        out['sale_date'] = pd.to_datetime(
+            date_col,
             format='%d/%m/%Y',
             errors='coerce'
         )
     except Exception as e:
         logger.warning(f"Date conversion issues: {e}")
+        out['sale_date'] = pd.Series(pd.NaT, index=df.index)
+    
+    # Clean text fields
+    out['address'] = df.pop('Address').str.strip()
+    out['county'] = df.pop('County').str.strip()
+    out['eircode'] = df.pop('Eircode').str.strip()
     
     # Clean and convert price
+    price_col = df.pop(config.PRICE_COLUMN)
     try:
-        # Remove currency symbol and commas, convert to float
-        df_clean['price_eur'] = (
-            df_clean['Price (€)']
-            .str.replace('€', '', regex=False)
-            .str.replace(',', '', regex=False)
-            .str.strip()
+        # Remove currency symbol, commas and whitespace in one pass
+        price = pd.to_numeric(
+            price_col.str.replace(_PRICE_STRIP_PATTERN, '', regex=True),
+            errors='coerce'
         )
-        df_clean['price_eur'] = pd.to_numeric(df_clean['price_eur'], errors='coerce')
+        # Arrow-backed floats keep coerced NaN distinct from nulls, so move to
+        # numpy float64 where both are just NaN
+        out['price_eur'] = price.astype('float64')
     except Exception as e:
         logger.warning(f"Price conversion issues: {e}")
+        out['price_eur'] = pd.Series(float('nan'), index=df.index)
     
-    # Convert boolean fields
-    df_clean['not_full_market_price'] = (
-        df_clean['Not Full Market Price'].str.strip().str.upper() == 'YES'
+    # Convert boolean fields (missing values count as "No")
+    out['not_full_market_price'] = (
+        df.pop('Not Full Market Price').str.strip().str.upper().eq('YES')
+        .fillna(False).astype(bool)
     )
-    df_clean['vat_exclusive'] = (
-        df_clean['VAT Exclusive'].str.strip().str.upper() == 'YES'
+    out['vat_exclusive'] = (
+        df.pop('VAT Exclusive').str.strip().str.upper().eq('YES')
+        .fillna(False).astype(bool)
     )
     
-    # Clean text fields
-    df_clean['address'] = df_clean['Address'].str.strip()
-    df_clean['county'] = df_clean['County'].str.strip()
-    df_clean['eircode'] = df_clean['Eircode'].str.strip()
-    df_clean['property_description'] = df_clean['Description of Property'].str.strip()
-    df_clean['property_size_category'] = df_clean['Property Size Description'].str.strip()
+    out['property_description'] = df.pop('Description of Property').str.strip()
+    out['property_size_category'] = df.pop('Property Size Description').str.strip()
     
     # Add derived fields
-    df_clean['year'] = df_clean['sale_date'].dt.year
-    df_clean['month'] = df_clean['sale_date'].dt.month
-    df_clean['quarter'] = df_clean['sale_date'].dt.quarter
-    
-    # Select final columns
-    final_columns = [
-        'sale_date', 'address', 'county', 'eircode', 'price_eur',
-        'not_full_market_price', 'vat_exclusive', 'property_description',
-        'property_size_category', 'year', 'month', 'quarter'
-    ]
+    out['year'] = out['sale_date'].dt.year
+    out['month'] = out['sale_date'].dt.month
+    out['quarter'] = out['sale_date'].dt.quarter
     
-    df_final = df_clean[final_columns].copy()
+    df_final = pd.DataFrame(out, copy=False).astype(_COMPACT_DTYPES)
     
     logger.info("Data cleaning completed")
     
@@ -199,20 +490,18 @@ def deduplicate_data(df: pd.DataFrame) -> pd.DataFrame:
     
     initial_count = len(df)
     
-    # Create composite key for deduplication
-    # Using address, date, price, and county
-    df['_unique_key'] = (
-        df['address'].fillna('').str.upper() + '|' +
-        df['sale_date'].astype(str) + '|' +
-        df['price_eur'].astype(str) + '|' +
-        df['county'].fillna('').str.upper()
-    )
+    # Composite key: address, date, price, and county. Text is compared
+    # case-insensitively without changing the stored values, and pandas
+    # hashes the key columns directly instead of a concatenated string key
+    key = pd.DataFrame({
+        'address': _upper(df['address']),
+        'sale_date': df['sale_date'],
+        'price_eur': df['price_eur'],
+        'county': _upper(df['county']),
+    }, copy=False)
     
     # Remove duplicates, keeping first occurrence
-    df_dedup = df.drop_duplicates(subset=['_unique_key'], keep='first')
-    
-    # Remove the temporary key column
-    df_dedup = df_dedup.drop(columns=['_unique_key'])
+    df_dedup = df[~key.duplicated(keep='first').to_numpy()]
     
     duplicates_removed = initial_count - len(df_dedup)
     
@@ -226,7 +515,8 @@ def deduplicate_data(df: pd.DataFrame) -> pd.DataFrame:
 
 def merge_datasets(
     existing: Optional[pd.DataFrame],
-    new_files: List[Path]
+    new_files: List[Path],
+    loaded_files: Optional[List[Dict]] = None
 ) -> pd.DataFrame:
     """
     Merge new data with existing dataset.
@@ -234,6 +524,7 @@ def merge_datasets(
     Args:
         existing: Existing DataFrame (can be None)
         new_files: List of new CSV files to merge
+        loaded_files: Filled with the files actually loaded (see load_csv_files)
     
     Returns:
         Merged and deduplicated DataFrame
@@ -244,11 +535,130 @@ def merge_datasets(
     logger.info("Starting merge operation...")
     
     # Load new data
-    new_data = load_csv_files(new_files)
+    new_data = load_csv_files(new_files, loaded_files)
+    
+    return _merge_new_data(existing, new_data)
+
+
+def merge_datasets_streaming(
+    existing: Optional[pd.DataFrame],
+    new_streams: Iterable[Tuple[str, BinaryIO]],
+    loaded_files: Optional[List[Dict]] = None
+) -> pd.DataFrame:
+    """
+    Merge data read from open CSV streams with existing dataset.
+    
+    Same as merge_datasets, but reads straight from file objects (such as
+    ZIP members from extractor.stream_zip_members) instead of CSV files on disk.
+    
+    Args:
+        existing: Existing DataFrame (can be None)
+        new_streams: Iterable of (name, binary file object) tuples
+        loaded_files: Filled with the streams actually loaded (see load_csv_streams)
+    
+    Returns:
+        Merged and deduplicated DataFrame
+    
+    Raises:
+        MergerError: If merge fails
+    """
+    logger.info("Starting streaming merge operation...")
+    
+    # Load new data
+    new_data = load_csv_streams(new_streams, loaded_files)
+    
+    return _merge_new_data(existing, new_data)
+
+
+def merge_datasets_by_year(
+    new_files: List[Path],
+    file_path: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    Merge new CSV files with only the year partitions of the existing dataset
+    that they touch.
     
-    # Clean and convert new data
-    new_data_clean = clean_and_convert_data(new_data)
+    Duplicates always share a sale date, and so a year, so partitions for
+    other years can't hold duplicates of the new rows and are left on disk.
+    Save the result with save_consolidated_data(..., partial=True) to replace
+    just those partitions. A legacy single-file dataset is loaded in full.
     
+    Args:
+        new_files: List of new CSV files to merge
+        file_path: Path to consolidated dataset (default: config.CONSOLIDATED_FILE)
+    
+    Returns:
+        Merged and deduplicated DataFrame for the affected years
+    
+    Raises:
+        MergerError: If merge fails
+    """
+    if file_path is None:
+        file_path = config.CONSOLIDATED_FILE
+    
+    logger.info("Starting merge operation...")
+    
+    # Load and clean new data first to find the years it covers
+    new_data_clean = _clean_new_data(load_csv_files(new_files))
+    
+    if file_path.is_dir():
+        years = [None if pd.isna(y) else int(y) for y in new_data_clean['year'].unique()]
+        logger.info(f"New data covers years: {sorted(y for y in years if y is not None)}")
+        existing = load_existing_data(file_path, years=years)
+    else:
+        existing = load_existing_data(file_path)
+    
+    return _combine_and_deduplicate(existing, new_data_clean)
+
+
+def _clean_new_data(new_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Check and clean freshly loaded raw data.
+    
+    Args:
+        new_data: Raw DataFrame as loaded from CSV
+    
+    Returns:
+        Cleaned DataFrame
+    
+    Raises:
+        MergerError: If the price column is missing
+    """
+    # Fail early if the price column was lost to an encoding mismatch
+    if config.PRICE_COLUMN not in new_data.columns:
+        raise MergerError(f"Price column '{config.PRICE_COLUMN}' not found in loaded data")
+    
+    return clean_and_convert_data(new_data)
+
+
+def _merge_new_data(existing: Optional[pd.DataFrame], new_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean freshly loaded raw data, combine with existing data and deduplicate.
+    
+    Args:
+        existing: Existing DataFrame (can be None)
+        new_data: Raw DataFrame as loaded from CSV
+    
+    Returns:
+        Merged and deduplicated DataFrame
+    """
+    return _combine_and_deduplicate(existing, _clean_new_data(new_data))
+
+
+def _combine_and_deduplicate(
+    existing: Optional[pd.DataFrame],
+    new_data_clean: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Combine cleaned new data with existing data and deduplicate.
+    
+    Args:
+        existing: Existing DataFrame (can be None)
+        new_data_clean: Cleaned new data
+    
+    Returns:
+        Merged and deduplicated DataFrame
+    """
     # Merge with existing if present
     if existing is not None:
         logger.info("Merging with existing dataset...")
@@ -265,18 +675,48 @@ def merge_datasets(
     return final_data
 
 
+def _remove_path(path: Path) -> None:
+    """Delete a file or directory tree if it exists."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _dataset_size_mb(path: Path) -> float:
+    """Total size of a Parquet file or dataset directory in MB."""
+    if path.is_dir():
+        size = sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+    else:
+        size = path.stat().st_size
+    return size / (1024 * 1024)
+
+
+def _partition_dirs(df: pd.DataFrame, dataset_path: Path) -> List[Path]:
+    """Year partition directories of dataset_path that hold df's sale years."""
+    names = [
+        _NULL_YEAR_PARTITION if pd.isna(year) else f"year={int(year)}"
+        for year in df['year'].unique()
+    ]
+    return [dataset_path / name for name in names]
+
+
 def save_consolidated_data(
     df: pd.DataFrame,
     output_path: Optional[Path] = None,
-    backup: bool = True
+    backup: bool = True,
+    partial: bool = False
 ) -> None:
     """
-    Save consolidated dataset to Parquet format.
+    Save consolidated dataset as Parquet, partitioned by sale year.
     
     Args:
         df: DataFrame to save
-        output_path: Output file path (default: config.CONSOLIDATED_FILE)
-        backup: Whether to backup existing file before overwriting
+        output_path: Output dataset directory (default: config.CONSOLIDATED_FILE)
+        backup: Whether to backup existing dataset before overwriting (for a
+            partial save, only the replaced year partitions are kept)
+        partial: If True, df holds only some years (see merge_datasets_by_year)
+            and just those year partitions are replaced
     
     Raises:
         MergerError: If save fails
@@ -287,33 +727,115 @@ def save_consolidated_data(
     # Ensure directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Backup existing file if requested
-    if backup and output_path.exists():
-        backup_path = config.CONSOLIDATED_BACKUP
-        logger.info(f"Backing up existing file to {backup_path.name}")
-        try:
-            shutil.copy2(output_path, backup_path)
-        except Exception as e:
-            logger.warning(f"Failed to create backup: {e}")
+    backup_path = config.CONSOLIDATED_BACKUP
     
     # Save to Parquet
     try:
         logger.info(f"Saving {len(df):,} records to {output_path.name}...")
         
-        df.to_parquet(
-            output_path,
+        # Concatenating frames with different categories falls back to object,
+        # so re-apply the compact dtypes, then pin every column to the dataset
+        # schema so all partitions share the same types
+        table = pa.Table.from_pandas(df.astype(_COMPACT_DTYPES), preserve_index=False)
+        table = table.select(_DATASET_SCHEMA.names).cast(_DATASET_SCHEMA)
+        file_options = ds.ParquetFileFormat().make_write_options(
             compression=config.PARQUET_COMPRESSION,
-            index=False
+            compression_level=config.PARQUET_COMPRESSION_LEVEL,
+            use_dictionary=True
         )
         
-        file_size = output_path.stat().st_size / (1024 * 1024)
-        logger.info(f"Successfully saved to {output_path} ({file_size:.1f} MB)")
+        if partial and output_path.is_dir():
+            # Rewrite only the year partitions present in df. With a backup,
+            # those partitions are moved aside (not copied) first, so the
+            # backup holds just the replaced years
+            moved = []
+            if backup:
+                logger.info(f"Backing up replaced year partitions to {backup_path.name}")
+                _remove_path(backup_path)
+                backup_path.mkdir()
+                for part_dir in _partition_dirs(df, output_path):
+                    if part_dir.exists():
+                        part_dir.rename(backup_path / part_dir.name)
+                        moved.append(part_dir)
+            
+            try:
+                ds.write_dataset(
+                    table,
+                    output_path,
+                    format='parquet',
+                    partitioning=_YEAR_PARTITIONING,
+                    file_options=file_options,
+                    existing_data_behavior='delete_matching'
+                )
+            except Exception:
+                # Put the previous partitions back rather than leave years missing
+                for part_dir in moved:
+                    _remove_path(part_dir)
+                    (backup_path / part_dir.name).rename(part_dir)
+                raise
+        else:
+            # Write the full dataset alongside, then swap it in
+            tmp_path = output_path.with_name(output_path.name + '.tmp')
+            _remove_path(tmp_path)
+            ds.write_dataset(
+                table,
+                tmp_path,
+                format='parquet',
+                partitioning=_YEAR_PARTITIONING,
+                file_options=file_options
+            )
+            
+            if output_path.exists():
+                if backup:
+                    logger.info(f"Backing up existing dataset to {backup_path.name}")
+                    _remove_path(backup_path)
+                    output_path.rename(backup_path)
+                else:
+                    _remove_path(output_path)
+            
+            tmp_path.rename(output_path)
+        
+        logger.info(f"Successfully saved to {output_path} ({_dataset_size_mb(output_path):.1f} MB)")
         
     except Exception as e:
         logger.error(f"Failed to save consolidated data: {e}")
         raise MergerError(f"Save failed: {e}")
 
 
+def recompress_consolidated_data(file_path: Optional[Path] = None) -> None:
+    """
+    Rewrite an existing consolidated dataset with the configured Parquet codec.
+    
+    One-off helper for data written before the switch from snappy to zstd;
+    also converts a single-file dataset to the year-partitioned layout.
+    
+    Args:
+        file_path: Path to consolidated dataset (default: config.CONSOLIDATED_FILE)
+    
+    Raises:
+        MergerError: If the dataset cannot be rewritten
+    """
+    if file_path is None:
+        file_path = config.CONSOLIDATED_FILE
+    
+    if not file_path.exists():
+        logger.info("No existing consolidated data to recompress")
+        return
+    
+    old_size = _dataset_size_mb(file_path)
+    df = load_existing_data(file_path)
+    
+    if df is None:
+        raise MergerError(f"Recompress failed: could not read {file_path}")
+    
+    save_consolidated_data(df, file_path, backup=False)
+    
+    logger.info(
+        f"Recompressed {file_path.name} with {config.PARQUET_COMPRESSION}: "
+        f"{old_size:.1f} MB -> {_dataset_size_mb(file_path):.1f} MB"
+    )
+
+
 def generate_data_summary(df: pd.DataFrame) -> Dict:
     """
     Generate summary statistics for the dataset.
@@ -326,18 +848,29 @@ def generate_data_summary(df: pd.DataFrame) -> Dict:
     """
     logger.info("Generating data summary...")
     
+    total_records = len(df)
+    
+    # One aggregation call per column instead of a scan per statistic; missing
+    # counts fall out of count() rather than separate isna() passes
+    date_stats = df['sale_date'].agg(['min', 'max', 'count'])
+    
+    if 'price_eur' in df:
+        price_stats = df['price_eur'].agg(['sum', 'mean', 'median', 'count'])
+    else:
+        price_stats = None
+    
     summary = {
-        'total_records': len(df),
-        'earliest_date': df['sale_date'].min().strftime('%Y-%m-%d') if pd.notna(df['sale_date'].min()) else None,
-        'latest_date': df['sale_date'].max().strftime('%Y-%m-%d') if pd.notna(df['sale_date'].max()) else None,
-        'total_value_eur': float(df['price_eur'].sum()) if 'price_eur' in df else 0,
-        'average_price_eur': float(df['price_eur'].mean()) if 'price_eur' in df else 0,
-        'median_price_eur': float(df['price_eur'].median()) if 'price_eur' in df else 0,
+        'total_records': total_records,
+        'earliest_date': date_stats['min'].strftime('%Y-%m-%d') if pd.notna(date_stats['min']) else None,
+        'latest_date': date_stats['max'].strftime('%Y-%m-%d') if pd.notna(date_stats['max']) else None,
+        'total_value_eur': float(price_stats['sum']) if price_stats is not None else 0,
+        'average_price_eur': float(price_stats['mean']) if price_stats is not None else 0,
+        'median_price_eur': float(price_stats['median']) if price_stats is not None else 0,
         'counties': df['county'].nunique() if 'county' in df else 0,
         'non_market_price_count': int(df['not_full_market_price'].sum()) if 'not_full_market_price' in df else 0,
         'vat_exclusive_count': int(df['vat_exclusive'].sum()) if 'vat_exclusive' in df else 0,
-        'missing_prices': int(df['price_eur'].isna().sum()) if 'price_eur' in df else 0,
-        'missing_dates': int(df['sale_date'].isna().sum()) if 'sale_date' in df else 0,
+        'missing_prices': total_records - int(price_stats['count']) if price_stats is not None else 0,
+        'missing_dates': total_records - int(date_stats['count']),
     }
     
     logger.info(f"Summary: {summary['total_records']:,} records from {summary['earliest_date']} to {summary['latest_date']}")
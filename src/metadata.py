@@ -4,16 +4,108 @@ Metadata management module for Irish Property Price Register ETL Pipeline.
 Handles pipeline state tracking, update detection, and run history.
 """
 
+import atexit
+import copy
+import hashlib
 import json
-from datetime import datetime, timedelta
+import os
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 from config import config
 from logger_config import get_logger
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib json module
+    orjson = None
+
 logger = get_logger(__name__)
 
+# Parsed metadata per file, keyed by path and tagged with the file's mtime_ns
+# and a digest of its bytes (used to skip rewriting identical metadata)
+_METADATA_CACHE: Dict[Path, Tuple[int, Dict, bytes]] = {}
+# Fields every metadata file must have, with their expected JSON types;
+# a missing key or a value of the wrong type is treated as corrupt
+_REQUIRED_FIELDS = {'total_records': int, 'data_coverage': dict, 'files_processed': list}
+
+# Dirty metadata saved with defer=True, written out by flush_metadata()
+_PENDING_METADATA: Dict[Path, Dict] = {}
+
+
+def _json_default(obj):
+    """Serialize the bounded files_processed deque as a JSON list."""
+    if isinstance(obj, deque):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _files_processed_history(entries=()) -> deque:
+    """Create the bounded processed-files history; the oldest entries drop off."""
+    return deque(entries, maxlen=config.FILES_PROCESSED_HISTORY)
+
+
+def _digest(data: bytes) -> bytes:
+    """Fingerprint serialized metadata."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _loads(data: bytes) -> Dict:
+    """Parse JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj: Dict) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+def _utc_now() -> Tuple[datetime, str]:
+    """Read the clock once and return the aware UTC time and its ISO string."""
+    now = datetime.now(timezone.utc)
+    return now, now.isoformat()
+
+
+@lru_cache(maxsize=16)
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp from metadata, memoized across status queries."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        # Older metadata stored naive local timestamps
+        parsed = parsed.astimezone()
+    return parsed
+
+
+# Fresh metadata layout, built once at import; initialize_metadata() deep-copies it
+_EMPTY_METADATA_TEMPLATE: Dict = {
+    'last_full_download': None,
+    'last_incremental_update': None,
+    'last_processed_month': None,
+    'total_records': 0,
+    'data_coverage': {
+        'earliest_date': None,
+        'latest_date': None
+    },
+    'files_processed': _files_processed_history(),
+    'initial_zip_sha256': None,
+    'initial_zip_crc': None,
+    'monthly_validators': {},
+    'register_last_updated': '12/11/2025 17:48:21',  # From website
+    'pipeline_version': '1.0',
+    'created_at': None
+}
+
 
 def initialize_metadata() -> Dict:
     """
@@ -22,20 +114,70 @@ def initialize_metadata() -> Dict:
     Returns:
         Empty metadata dictionary
     """
-    return {
-        'last_full_download': None,
-        'last_incremental_update': None,
-        'last_processed_month': None,
-        'total_records': 0,
-        'data_coverage': {
-            'earliest_date': None,
-            'latest_date': None
-        },
-        'files_processed': [],
-        'register_last_updated': '12/11/2025 17:48:21',  # From website
-        'pipeline_version': '1.0',
-        'created_at': datetime.now().isoformat()
-    }
+    metadata = copy.deepcopy(_EMPTY_METADATA_TEMPLATE)
+    metadata['created_at'] = _utc_now()[1]
+    return metadata
+
+
+def _read_metadata(metadata_path: Path) -> Optional[Dict]:
+    """
+    Return the parsed metadata for a file, from the cache when it is unchanged.
+    
+    The returned dict is shared with the cache and must not be mutated.
+    
+    Args:
+        metadata_path: Path to metadata file
+    
+    Returns:
+        Metadata dictionary, or None if the file is missing or unreadable
+    """
+    # Unflushed changes are newer than the file on disk
+    if metadata_path in _PENDING_METADATA:
+        return _PENDING_METADATA[metadata_path]
+    
+    try:
+        stat = metadata_path.stat()
+    except FileNotFoundError:
+        _METADATA_CACHE.pop(metadata_path, None)
+        logger.info("No existing metadata found")
+        return None
+    
+    mtime_ns = stat.st_mtime_ns
+    if stat.st_size == 0:
+        logger.error(f"Metadata file is empty: {metadata_path}")
+        return None
+    
+    cached = _METADATA_CACHE.get(metadata_path)
+    if cached is not None and cached[0] == mtime_ns:
+        logger.debug("Metadata unchanged on disk, using cached copy")
+        return cached[1]
+    
+    try:
+        data = metadata_path.read_bytes()
+        metadata = _loads(data)
+    except (OSError, ValueError) as e:  # ValueError covers both JSONDecodeErrors
+        logger.error(f"Failed to load metadata: {e}")
+        return None
+    
+    if not isinstance(metadata, dict) or not metadata.keys() >= _REQUIRED_FIELDS.keys():
+        logger.error(f"Metadata file is missing required keys: {metadata_path}")
+        return None
+    
+    invalid = [
+        key for key, expected in _REQUIRED_FIELDS.items()
+        # bool is a subclass of int, but true/false is not a record count
+        if not isinstance(metadata[key], expected) or isinstance(metadata[key], bool)
+    ]
+    if invalid:
+        logger.error(f"Metadata file has invalid values for {', '.join(invalid)}: {metadata_path}")
+        return None
+    
+    metadata['files_processed'] = _files_processed_history(metadata['files_processed'])
+    _METADATA_CACHE[metadata_path] = (mtime_ns, metadata, _digest(data))
+    logger.info("Loaded existing metadata")
+    logger.debug(f"Last full download: {metadata.get('last_full_download')}")
+    logger.debug(f"Last processed month: {metadata.get('last_processed_month')}")
+    return metadata
 
 
 def load_metadata(metadata_path: Optional[Path] = None) -> Dict:
@@ -51,47 +193,127 @@ def load_metadata(metadata_path: Optional[Path] = None) -> Dict:
     if metadata_path is None:
         metadata_path = config.METADATA_FILE
     
-    if not metadata_path.exists():
-        logger.info("No existing metadata found, initializing new metadata")
-        return initialize_metadata()
-    
-    try:
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
-        logger.info("Loaded existing metadata")
-        logger.debug(f"Last full download: {metadata.get('last_full_download')}")
-        logger.debug(f"Last processed month: {metadata.get('last_processed_month')}")
-        return metadata
-        
-    except Exception as e:
-        logger.error(f"Failed to load metadata: {e}")
+    metadata = _read_metadata(metadata_path)
+    if metadata is None:
         logger.info("Initializing new metadata")
         return initialize_metadata()
+    
+    # Callers mutate the returned dict, so hand out a copy of the cached one
+    return copy.deepcopy(metadata)
 
 
-def save_metadata(metadata: Dict, metadata_path: Optional[Path] = None) -> None:
+def load_metadata_summary(metadata_path: Optional[Path] = None) -> Dict:
+    """
+    Load only the metadata fields get_pipeline_status needs.
+    
+    Unlike load_metadata, this does not copy the files_processed history;
+    it is replaced by files_processed_count.
+    
+    Args:
+        metadata_path: Path to metadata file (default: config.METADATA_FILE)
+    
+    Returns:
+        Read-only summary of the metadata (defaults if the file doesn't exist)
+    """
+    if metadata_path is None:
+        metadata_path = config.METADATA_FILE
+    
+    metadata = _read_metadata(metadata_path)
+    if metadata is None:
+        metadata = initialize_metadata()
+    
+    return {
+        'total_records': metadata['total_records'],
+        'data_coverage': dict(metadata['data_coverage']),
+        'last_full_download': metadata.get('last_full_download'),
+        'last_incremental_update': metadata.get('last_incremental_update'),
+        'files_processed_count': len(metadata['files_processed']),
+    }
+
+
+def save_metadata(
+    metadata: Dict,
+    metadata_path: Optional[Path] = None,
+    defer: bool = False
+) -> None:
     """
     Save metadata to JSON file.
     
+    The file is written to a temporary path and swapped into place, so a crash
+    mid-write never leaves a truncated metadata file behind.
+    
     Args:
         metadata: Metadata dictionary
         metadata_path: Path to metadata file (default: config.METADATA_FILE)
+        defer: Only mark the metadata dirty; it is written by flush_metadata()
     """
     if metadata_path is None:
         metadata_path = config.METADATA_FILE
     
+    if defer:
+        _PENDING_METADATA[metadata_path] = copy.deepcopy(metadata)
+        logger.debug(f"Metadata save to {metadata_path} deferred")
+        return
+    
+    _PENDING_METADATA.pop(metadata_path, None)
+    _write_metadata(metadata, metadata_path)
+
+
+def flush_metadata(metadata_path: Optional[Path] = None) -> None:
+    """
+    Write out metadata saved with defer=True.
+    
+    Args:
+        metadata_path: Only flush this file (default: every pending file)
+    """
+    if metadata_path is None:
+        paths = list(_PENDING_METADATA)
+    else:
+        paths = [metadata_path] if metadata_path in _PENDING_METADATA else []
+    
+    for path in paths:
+        _write_metadata(_PENDING_METADATA.pop(path), path)
+
+
+def _write_metadata(metadata: Dict, metadata_path: Path) -> None:
+    """Atomically write metadata and refresh the cache entry."""
     # Ensure directory exists
     metadata_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = metadata_path.with_suffix(metadata_path.suffix + '.tmp')
     
     try:
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        data = _dumps(metadata)
+        digest = _digest(data)
+        
+        # Skip the write if the file on disk already holds these exact bytes
+        cached = _METADATA_CACHE.get(metadata_path)
+        if cached is not None and cached[2] == digest:
+            try:
+                unchanged = metadata_path.stat().st_mtime_ns == cached[0]
+            except FileNotFoundError:
+                unchanged = False
+            if unchanged:
+                logger.debug("Metadata unchanged, skipping write")
+                return
+        
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, metadata_path)
+        _METADATA_CACHE[metadata_path] = (
+            metadata_path.stat().st_mtime_ns, copy.deepcopy(metadata), digest
+        )
         logger.info(f"Metadata saved to {metadata_path}")
         
     except Exception as e:
+        _METADATA_CACHE.pop(metadata_path, None)
+        tmp_path.unlink(missing_ok=True)
         logger.error(f"Failed to save metadata: {e}")
 
 
+# Don't lose deferred saves if the caller never flushes
+atexit.register(flush_metadata)
+
+
 def get_months_to_update(
     metadata: Dict,
     current_date: Optional[datetime] = None
@@ -129,18 +351,13 @@ def get_months_to_update(
             logger.warning(f"Invalid last_processed_month format: {last_processed}, {e}")
             start_date = current_date - timedelta(days=60)
     
-    # Generate list of months to download
-    # Start from month after last processed
-    check_date = start_date + timedelta(days=32)  # Move to next month
-    check_date = check_date.replace(day=1)  # First day of month
+    # Generate list of months to download, counting months as year * 12 + (month - 1)
+    # Start from month after last processed, up to and including the current month
+    start_ym = start_date.year * 12 + start_date.month
+    end_ym = current_date.year * 12 + current_date.month - 1
     
-    while check_date <= current_date:
-        year = check_date.year
-        month = check_date.month
-        months_to_download.append((year, month))
-        
-        # Move to next month
-        check_date = (check_date + timedelta(days=32)).replace(day=1)
+    for ym in range(start_ym, end_ym + 1):
+        months_to_download.append((ym // 12, ym % 12 + 1))
     
     logger.info(f"Identified {len(months_to_download)} months to download")
     for year, month in months_to_download:
@@ -166,39 +383,60 @@ def update_metadata_after_run(
     logger.info("Updating metadata after run...")
     
     # Update timestamps
-    now = datetime.now().isoformat()
-    
-    if run_info.get('mode') == 'initial':
+    _, now = _utc_now()
+    
+    # Look up each run_info field once
+    mode = run_info.get('mode')
+    latest_month = run_info.get('latest_month')
+    zip_sha256 = run_info.get('zip_sha256')
+    zip_crc = run_info.get('zip_crc')
+    monthly_validators = run_info.get('monthly_validators')
+    total_records = run_info.get('total_records')
+    summary = run_info.get('data_summary')
+    new_files = run_info.get('files_processed')
+    
+    if mode == 'initial':
         metadata['last_full_download'] = now
-    elif run_info.get('mode') == 'incremental':
+    elif mode == 'incremental':
         metadata['last_incremental_update'] = now
     
     # Update last processed month
-    if run_info.get('latest_month'):
-        metadata['last_processed_month'] = run_info['latest_month']
+    if latest_month:
+        metadata['last_processed_month'] = latest_month
+    
+    # Remember which PPR-ALL.zip the consolidated data was built from
+    if zip_sha256:
+        metadata['initial_zip_sha256'] = zip_sha256
+    if zip_crc is not None:
+        metadata['initial_zip_crc'] = zip_crc
+    
+    # Store HTTP cache validators for conditional monthly downloads
+    if monthly_validators:
+        metadata.setdefault('monthly_validators', {}).update(monthly_validators)
     
     # Update record count
-    if run_info.get('total_records') is not None:
-        metadata['total_records'] = run_info['total_records']
+    if total_records is not None:
+        metadata['total_records'] = total_records
     
     # Update data coverage
-    if run_info.get('data_summary'):
-        summary = run_info['data_summary']
-        metadata['data_coverage']['earliest_date'] = summary.get('earliest_date')
-        metadata['data_coverage']['latest_date'] = summary.get('latest_date')
-    
-    # Add to files processed (keep last 100)
-    if run_info.get('files_processed'):
-        for file_info in run_info['files_processed']:
-            file_entry = {
+    if summary:
+        coverage = metadata['data_coverage']
+        coverage['earliest_date'] = summary.get('earliest_date')
+        coverage['latest_date'] = summary.get('latest_date')
+    
+    # Add to files processed (the bounded deque keeps only the most recent entries)
+    if new_files:
+        files_processed = metadata['files_processed']
+        if not isinstance(files_processed, deque):
+            files_processed = metadata['files_processed'] = _files_processed_history(files_processed)
+        files_processed.extend([
+            {
                 'filename': file_info['filename'],
                 'processed_at': now,
                 'record_count': file_info.get('record_count', 0)
             }
-            metadata['files_processed'].append(file_entry)
-        
-        # Keep only last 100 files
-        metadata['files_processed'] = metadata['files_processed'][-100:]
+            for file_info in new_files
+        ])
     
     logger.info("Metadata updated successfully")
     
@@ -210,28 +448,36 @@ def get_pipeline_status(metadata: Dict) -> Dict:
     Get a summary of pipeline status.
     
     Args:
-        metadata: Current metadata
+        metadata: Current metadata, or the result of load_metadata_summary()
     
     Returns:
         Status summary dictionary
     """
+    total_records = metadata['total_records']
+    last_full_download = metadata.get('last_full_download')
+    last_update = metadata.get('last_incremental_update') or last_full_download
+    files_processed_count = metadata.get('files_processed_count')
+    if files_processed_count is None:
+        files_processed_count = len(metadata['files_processed'])
+    
     status = {
-        'has_data': metadata['total_records'] > 0,
-        'total_records': metadata['total_records'],
+        'has_data': total_records > 0,
+        'total_records': total_records,
         'data_coverage': metadata['data_coverage'],
-        'last_update': metadata.get('last_incremental_update') or metadata.get('last_full_download'),
-        'files_processed_count': len(metadata['files_processed']),
-        'needs_initial_load': metadata.get('last_full_download') is None
+        'last_update': last_update,
+        'files_processed_count': files_processed_count,
+        'needs_initial_load': last_full_download is None
     }
     
     # Check if data is stale (more than 30 days old)
-    if status['last_update']:
+    if last_update:
         try:
-            last_update_dt = datetime.fromisoformat(status['last_update'])
-            days_since_update = (datetime.now() - last_update_dt).days
+            last_update_dt = _parse_timestamp(last_update)
+            now, _ = _utc_now()
+            days_since_update = (now - last_update_dt).days
             status['days_since_update'] = days_since_update
             status['is_stale'] = days_since_update > 30
-        except:
+        except (TypeError, ValueError):
             status['days_since_update'] = None
             status['is_stale'] = False
     else:
@@ -247,7 +493,7 @@ if __name__ == "__main__":
     
     # Load or create metadata
     metadata = load_metadata()
-    logger.info(f"Metadata: {json.dumps(metadata, indent=2)}")
+    logger.info(f"Metadata: {json.dumps(metadata, indent=2, default=_json_default)}")
     
     # Get status
     status = get_pipeline_status(metadata)